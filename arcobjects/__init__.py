@@ -25,11 +25,17 @@ import struct
 import comtypes
 from comtypes.client import GetModule, CreateObject
 if struct.calcsize('P') * 8 != 32:
-    raise ImportError('Must use ArcObjects in 32 bit!')
+    raise ImportError('Must use ArcObjects in 32 bit!  From 64 bit Python use arcobjects_remote.WorkerClient')
 import os
 import glob
 import sys
 import datetime
+import threading
+import json
+import tempfile
+import collections
+import time
+from arcobjects_remote.nulls import null_substitutes, null_mask
 
 ACCESS_MODE = {
                 0: 'unknown',
@@ -38,6 +44,28 @@ ACCESS_MODE = {
                 6: 'read/write'
               }
 
+# numpy dtypes for esriFieldType codes, strings are sized from IField.Length
+#   http://resources.arcgis.com/en/help/arcobjects-net/componenthelp/index.html#//0025000002v1000000
+FIELD_DTYPES = {
+                0: 'i2',       # esriFieldTypeSmallInteger
+                1: 'i4',       # esriFieldTypeInteger
+                2: 'f4',       # esriFieldTypeSingle
+                3: 'f8',       # esriFieldTypeDouble
+                4: 'U',        # esriFieldTypeString
+                5: 'M8[us]',   # esriFieldTypeDate
+                6: 'i4',       # esriFieldTypeOID
+                7: 'O',        # esriFieldTypeGeometry
+                8: 'O',        # esriFieldTypeBlob
+                9: 'O',        # esriFieldTypeRaster
+                10: 'U38',     # esriFieldTypeGUID
+                11: 'U38',     # esriFieldTypeGlobalID
+                12: 'O'        # esriFieldTypeXML
+               }
+
+# wider string fields (memo, text(max) and CLOB fields report lengths near
+# 2**30) are read as 'O' python strings instead of fixed width 'U' arrays
+MAX_STRING_WIDTH = 4096
+
 def load_mod(filterer=None):
     '''loads a list of all modules (*.olb files)
 
@@ -64,14 +92,79 @@ def load_all():
         GetModule(mod)
     return
 
-def InstallInfo():
-    """Gets ArcGIS Install Info"""
-    # Get ArcObjects version
-    g = comtypes.GUID("{6FCCEDE0-179D-4D12-B586-58C88D26CA78}")
-    GetModule((g, 1, 0))
-    import comtypes.gen.ArcGISVersionLib as esriVersion
-    pVM = NewObj(esriVersion.VersionManager, esriVersion.IArcGISVersion)
-    return pVM.GetVersions().Next()
+# on disk copy of InstallInfo(), validated against the mtime of the install's com directory
+INSTALL_MANIFEST = os.path.join(os.environ.get('LOCALAPPDATA', tempfile.gettempdir()),
+                                'arcobjects', 'install_info.json')
+_install_info = None
+
+def _com_mtime(install_dir):
+    """returns the modified time of the com folder for an install or None"""
+    try:
+        return os.path.getmtime(os.path.join(install_dir, 'com'))
+    except (OSError, TypeError):
+        return None
+
+def _read_install_manifest():
+    """returns the install info from INSTALL_MANIFEST if it is still valid"""
+    try:
+        with open(INSTALL_MANIFEST, 'r') as f:
+            manifest = json.load(f)
+        info = tuple(manifest['install_info'])
+    except (IOError, ValueError, KeyError, TypeError):
+        return None
+    if _com_mtime(info[2]) != manifest.get('mtime'):
+        return None
+    return info
+
+def _write_install_manifest(info):
+    """saves the install info to INSTALL_MANIFEST, failures are ignored"""
+    try:
+        folder = os.path.dirname(INSTALL_MANIFEST)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = INSTALL_MANIFEST + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'install_info': list(info), 'mtime': _com_mtime(info[2])}, f)
+        if os.path.exists(INSTALL_MANIFEST):
+            os.remove(INSTALL_MANIFEST)
+        os.rename(tmp, INSTALL_MANIFEST)
+    except (IOError, OSError):
+        pass
+
+def ClearInstallCache(manifest=True):
+    """Invalidates the cached install info
+
+    Optional:
+    manifest -- also delete the on disk manifest.  Default is True
+    """
+    global _install_info
+    _install_info = None
+    if manifest and os.path.exists(INSTALL_MANIFEST):
+        os.remove(INSTALL_MANIFEST)
+
+def InstallInfo(refresh=False):
+    """Gets ArcGIS Install Info
+
+    The result is cached in memory and in INSTALL_MANIFEST, so the version
+    manager is only queried when the install changes.
+
+    Optional:
+    refresh -- ignore any cached info and query the version manager.  Default is False
+    """
+    global _install_info
+    if _install_info is not None and not refresh:
+        return _install_info
+    info = None if refresh else _read_install_manifest()
+    if info is None:
+        # Get ArcObjects version
+        g = comtypes.GUID("{6FCCEDE0-179D-4D12-B586-58C88D26CA78}")
+        GetModule((g, 1, 0))
+        import comtypes.gen.ArcGISVersionLib as esriVersion
+        pVM = NewObj(esriVersion.VersionManager, esriVersion.IArcGISVersion)
+        info = tuple(pVM.GetVersions().Next())
+        _write_install_manifest(info)
+    _install_info = info
+    return info
 
 def GetLibPath():
     '''Reference to com directory which houses ArcObjects
@@ -206,29 +299,123 @@ def GetMxDoc(pMxDoc):
 
 #********* Stand alone ****
 
-def InitStandalone():
-    """Init standalone ArcGIS license"""
-    # Set ArcObjects version
-    g = comtypes.GUID("{6FCCEDE0-179D-4D12-B586-58C88D26CA78}")
-    GetModule((g, 1, 0))
-    import comtypes.gen.ArcGISVersionLib as esriVersion
-    import comtypes.gen.esriSystem as esriSystem
-    pVM = NewObj(esriVersion.VersionManager, esriVersion.IArcGISVersion)
-    # make sure version matches
-    if not pVM.LoadVersion(esriVersion.esriArcGISDesktop, GetVersion()):
+class AoSession(object):
+    """Process wide ArcObjects license session
+
+    The version is bound and a product license is checked out only once, later
+    calls to ensure() are no-ops.  Use GetSession() rather than creating these
+    directly.
+
+    Attributes:
+    product -- esriLicenseProductCode that was checked out (None until initialized)
+    version -- ArcGIS version that was loaded
+    extensions -- list of extension codes checked out through this session
+    """
+    def __init__(self):
+        self.product = None
+        self.version = None
+        self.extensions = []
+        self.initialized = False
+        self.aoInit = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    def ensure(self):
+        """Initializes the license if needed, returns True if a license is checked out
+
+        Safe to call from worker threads, COM is initialized for the calling
+        thread the first time it calls this method.
+        """
+        if not getattr(self._local, 'com_initialized', False):
+            # comtypes already initialized COM in the thread that imported it
+            if threading.current_thread() is not _import_thread:
+                comtypes.CoInitialize()
+            self._local.com_initialized = True
+        if self.initialized:
+            return True
+        with self._lock:
+            if not self.initialized:
+                self.initialized = self._initialize()
+        return self.initialized
+
+    def _initialize(self):
+        # Set ArcObjects version
+        g = comtypes.GUID("{6FCCEDE0-179D-4D12-B586-58C88D26CA78}")
+        GetModule((g, 1, 0))
+        import comtypes.gen.ArcGISVersionLib as esriVersion
+        import comtypes.gen.esriSystem as esriSystem
+        pVM = NewObj(esriVersion.VersionManager, esriVersion.IArcGISVersion)
+        # make sure version matches
+        version = GetVersion()
+        if not pVM.LoadVersion(esriVersion.esriArcGISDesktop, version):
+            return False
+        self.version = version
+        # Get license
+        pInit = NewObj(esriSystem.AoInitialize, esriSystem.IAoInitialize)
+        ProductList = [esriSystem.esriLicenseProductCodeAdvanced, \
+                       esriSystem.esriLicenseProductCodeStandard, \
+                       esriSystem.esriLicenseProductCodeBasic]
+        for eProduct in ProductList:
+            licenseStatus = pInit.IsProductCodeAvailable(eProduct)
+            if licenseStatus != esriSystem.esriLicenseAvailable:
+                continue
+            licenseStatus = pInit.Initialize(eProduct)
+            if licenseStatus == esriSystem.esriLicenseCheckedOut:
+                self.aoInit = pInit
+                self.product = eProduct
+                return True
+            return False
         return False
-    # Get license
-    pInit = NewObj(esriSystem.AoInitialize, esriSystem.IAoInitialize)
-    ProductList = [esriSystem.esriLicenseProductCodeAdvanced, \
-                   esriSystem.esriLicenseProductCodeStandard, \
-                   esriSystem.esriLicenseProductCodeBasic]
-    for eProduct in ProductList:
-        licenseStatus = pInit.IsProductCodeAvailable(eProduct)
-        if licenseStatus != esriSystem.esriLicenseAvailable:
-            continue
-        licenseStatus = pInit.Initialize(eProduct)
-        return (licenseStatus == esriSystem.esriLicenseCheckedOut)
-    return False
+
+    def CheckOutExtension(self, ext_code):
+        """checks out an extension (see check_extension() for codes), returns True
+        if the extension is checked out"""
+        import comtypes.gen.esriSystem as esriSystem
+        if not self.ensure():
+            return False
+        ext_code = int(ext_code)
+        with self._lock:
+            if ext_code in self.extensions:
+                return True
+            status = self.aoInit.CheckOutExtension(ext_code)
+            if status != esriSystem.esriExtensionCheckedOut:
+                return False
+            self.extensions.append(ext_code)
+        return True
+
+    def Shutdown(self):
+        """checks in all extensions and the product license"""
+        with self._lock:
+            if self.aoInit:
+                for ext_code in self.extensions:
+                    self.aoInit.CheckInExtension(ext_code)
+                self.aoInit.Shutdown()
+            # keep the same lock so threads waiting on it see the reset state
+            self.product = None
+            self.version = None
+            self.extensions = []
+            self.aoInit = None
+            self.initialized = False
+
+_session = None
+_import_thread = threading.current_thread()
+_session_lock = threading.Lock()
+
+def GetSession():
+    """returns the process wide AoSession"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = AoSession()
+    return _session
+
+def InitStandalone():
+    """Init standalone ArcGIS license
+
+    The license is only checked out on the first call, see AoSession
+    """
+    return GetSession().ensure()
 
 
 def check_extension(ext_code):
@@ -247,9 +434,11 @@ def check_extension(ext_code):
     http://resources.arcgis.com/en/help/arcobjects-net/componenthelp/index.html#//004200000021000000
     """
     from comtypes.gen import esriSystem
-    # now call AoInitialize
-    pInit = NewObj(esriSystem.AoInitialize,
-                    esriSystem.IAoInitialize)
+    # reuse the session license if there is one, otherwise call AoInitialize
+    pInit = GetSession().aoInit
+    if pInit is None:
+        pInit = NewObj(esriSystem.AoInitialize,
+                        esriSystem.IAoInitialize)
 
     # check extension
     return pInit.IsExtensionCheckedOut(int(ext_code))
@@ -294,6 +483,123 @@ def create_mxd(mapDoc):
     mxd.Close()
     return mapDoc
 
+class WorkspacePool(object):
+    """LRU cache of open workspaces
+
+    Workspaces are keyed by their normalized path or by the contents of their
+    connection properties.  COM objects live in the apartment of the thread
+    that created them, so by default every thread gets its own partition.
+    Partitions are thread local, so a thread's workspaces are dropped when it
+    exits and are never handed to a later thread.
+
+    Optional:
+    max_size -- number of workspaces to keep open per partition.  Default is 16
+    per_thread -- partition the pool by thread.  Default is True
+    """
+    def __init__(self, max_size=16, per_thread=True):
+        self.max_size = max_size
+        self.per_thread = per_thread
+        self._local = threading.local()
+        self._shared = collections.OrderedDict()
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def _partition(self):
+        """returns the OrderedDict for the calling thread"""
+        if not self.per_thread:
+            return self._shared
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            # new thread, or Clear() was called since this thread last used the pool
+            local.pool = collections.OrderedDict()
+            local.generation = self._generation
+        return local.pool
+
+    @staticmethod
+    def PathKey(sPath):
+        """returns a pool key for a workspace on disk"""
+        return ('path', os.path.normcase(os.path.abspath(sPath.strip())))
+
+    @staticmethod
+    def PropertyKey(factory, props):
+        """returns a pool key for a workspace factory name and a dictionary of
+        connection properties"""
+        return ('props', factory, tuple(sorted((str(k).upper(), str(v))
+                                               for k, v in props.iteritems() if v)))
+
+    def Get(self, key, opener):
+        """returns the workspace for key, calling opener() to open it if it is
+        not already in the pool"""
+        pool = self._partition()
+        with self._lock:
+            if key in pool:
+                pWS = pool.pop(key)
+                pool[key] = pWS
+                return pWS
+        pWS = opener()
+        if pWS is None:
+            return None
+        with self._lock:
+            pool[key] = pWS
+            while len(pool) > self.max_size:
+                pool.popitem(last=False)
+        return pWS
+
+    def Release(self, key=None):
+        """removes a workspace from the calling thread's partition, or all of
+        them if no key is given"""
+        pool = self._partition()
+        with self._lock:
+            if key is None:
+                pool.clear()
+            else:
+                pool.pop(key, None)
+
+    def Clear(self):
+        """removes every workspace from every partition, other threads drop
+        theirs the next time they use the pool"""
+        with self._lock:
+            self._generation += 1
+            self._shared.clear()
+        self._partition()
+
+    def __contains__(self, key):
+        return key in self._partition()
+
+    def __len__(self):
+        return len(self._partition())
+
+WORKSPACE_POOL = WorkspacePool()
+
+# workspace factories by file extension, used by OpenWorkspace()
+WORKSPACE_FACTORIES = {
+                        '.gdb': 'FileGDBWorkspaceFactory',
+                        '.mdb': 'AccessWorkspaceFactory',
+                        '.sde': 'SdeWorkspaceFactory'
+                      }
+
+def OpenWorkspace(sPath):
+    """Opens a workspace from a path through WORKSPACE_POOL
+
+    sPath -- path to a File Geodatabase, Personal Geodatabase or .sde
+        connection file
+    """
+    InitStandalone()
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
+    ext = os.path.splitext(sPath.strip().rstrip('\\/'))[1].lower()
+    factory = getattr(esriDataSourcesGDB, WORKSPACE_FACTORIES.get(ext, 'FileGDBWorkspaceFactory'))
+
+    def opener():
+        pWSF = NewObj(factory, esriGeoDatabase.IWorkspaceFactory2)
+        return pWSF.OpenFromFile(sPath, 0)
+    return WORKSPACE_POOL.Get(WorkspacePool.PathKey(sPath), opener)
+
+def ReleaseWorkspace(sPath=None):
+    """Removes a workspace path from WORKSPACE_POOL, or all workspaces opened
+    by the calling thread if no path is given"""
+    WORKSPACE_POOL.Release(WorkspacePool.PathKey(sPath) if sPath else None)
+
 def Standalone_OpenSDE(server, instance, database=None, mode='OSA', version=None):
     """open SDE database
 
@@ -305,19 +611,21 @@ def Standalone_OpenSDE(server, instance, database=None, mode='OSA', version=None
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
     import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
 
-    pPropSet = NewObj(esriSystem.PropertySet, esriSystem.IPropertySet)
     props = {'SERVER': server,
              'INSTANCE': instance,
              'AUTHENTICATION_MODE': mode,
              'DATABASE': database,
              'VERSION': version}
 
-    for prop, val in props.iteritems():
-        if val:
-            pPropSet.SetProperty(prop, val)
-    pWSF = NewObj(esriDataSourcesGDB.SdeWorkspaceFactory, \
-                  esriGeoDatabase.IWorkspaceFactory)
-    pWS = pWSF.Open(pPropSet, 0)
+    def opener():
+        pPropSet = NewObj(esriSystem.PropertySet, esriSystem.IPropertySet)
+        for prop, val in props.iteritems():
+            if val:
+                pPropSet.SetProperty(prop, val)
+        pWSF = NewObj(esriDataSourcesGDB.SdeWorkspaceFactory, \
+                      esriGeoDatabase.IWorkspaceFactory)
+        return pWSF.Open(pPropSet, 0)
+    pWS = WORKSPACE_POOL.Get(WorkspacePool.PropertyKey('SdeWorkspaceFactory', props), opener)
     pDS = CType(pWS, esriGeoDatabase.IDataset)
     print "Workspace name: " + pDS.BrowseName
     print "Workspace category: " + pDS.Category
@@ -333,9 +641,11 @@ def Standalone_OpenFileGDB(sPath):
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
     import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
 
-    pWSF = NewObj(esriDataSourcesGDB.FileGDBWorkspaceFactory, \
-                  esriGeoDatabase.IWorkspaceFactory)
-    pWS = pWSF.OpenFromFile(sPath, 0)
+    def opener():
+        pWSF = NewObj(esriDataSourcesGDB.FileGDBWorkspaceFactory, \
+                      esriGeoDatabase.IWorkspaceFactory)
+        return pWSF.OpenFromFile(sPath, 0)
+    pWS = WORKSPACE_POOL.Get(WorkspacePool.PathKey(sPath), opener)
     pDS = CType(pWS, esriGeoDatabase.IDataset)
     print "Workspace name: " + pDS.BrowseName
     print "Workspace category: " + pDS.Category
@@ -345,18 +655,9 @@ def CheckGDBRelease(sPath):
     """open file GDB"""
     if not os.path.exists(sPath):
         raise IOError('"{}" does not exist!'.format(sPath))
-    InitStandalone()
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-    import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
 
-    if sPath.strip().endswith('.gdb'):
-        pWSF = NewObj(esriDataSourcesGDB.FileGDBWorkspaceFactory, \
-                  esriGeoDatabase.IWorkspaceFactory2)
-    elif sPath.strip().endswith('.mdb'):
-        pWSF = NewObj(esriDataSourcesGDB.AccessWorkspaceFactory, \
-                      esriGeoDatabase.IWorkspaceFactory2)
-
-    pWS = pWSF.OpenFromFile(sPath, 0)
+    pWS = OpenWorkspace(sPath)
     pGDBRelease = CType(pWS, esriGeoDatabase.IGeodatabaseRelease2)
     return pGDBRelease.CurrentRelease, pGDBRelease.MajorVersion, pGDBRelease.MinorVersion
 
@@ -365,12 +666,8 @@ def OpenFeatureClass(sFileGDB, sFCName):
     sFileGDB -- path to File Geodatabase
     sFCName -- name of feature class
     """
-    InitStandalone()
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-    import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
-    pWSF = NewObj(esriDataSourcesGDB.FileGDBWorkspaceFactory, \
-                  esriGeoDatabase.IWorkspaceFactory2)
-    pWS = pWSF.OpenFromFile(sFileGDB, 0)
+    pWS = OpenWorkspace(sFileGDB)
     pFWS = CType(pWS, esriGeoDatabase.IFeatureWorkspace)
 
     # determine if FC exists before attempting to open
@@ -385,12 +682,202 @@ def OpenFeatureClass(sFileGDB, sFCName):
 
     return pFC
 
-def iterFeatures(fc, recycle=True):
+FieldInfo = collections.namedtuple('FieldInfo', 'name alias index type length nullable domain')
+
+class Schema(collections.namedtuple('Schema', 'key version fields oid_field shape_field '
+                                              'geometry_type has_z has_m factory_code lookup')):
+    """Immutable snapshot of a table's fields, see GetSchema()
+
+    Attributes:
+    key -- (workspace key, dataset name) identifying the dataset, see _workspaceKey()
+    version -- modified time of the dataset when the snapshot was taken (None if unknown)
+    fields -- tuple of FieldInfo(name, alias, index, type, length, nullable, domain)
+    oid_field -- name of the OID field or None
+    shape_field -- name of the shape field or None
+    geometry_type, has_z, has_m, factory_code -- geometry definition of the
+        shape field (spatial reference factory code), None for tables
+    """
+    __slots__ = ()
+
+    def field(self, name):
+        """returns the FieldInfo for a field name (case insensitive)"""
+        try:
+            return self.fields[self.lookup[name.lower()]]
+        except KeyError:
+            raise ValueError('"{}" is not a valid field!'.format(name))
+
+    def index(self, name):
+        """returns the field index for a field name"""
+        return self.field(name).index
+
+    def indices(self, names):
+        """returns a list of field indices for a list of field names"""
+        return [self.field(n).index for n in names]
+
+_schema_cache = {}
+_schema_lock = threading.Lock()
+
+# schemas of datasets with no modified time (such as SDE tables) can not be
+# checked for changes, they are only cached when this is True and are then
+# kept until ClearSchemaCache() is called for them
+CACHE_UNTRACKED_SCHEMAS = False
+
+def _workspaceKey(pWS):
+    """returns the normalized path of a workspace, or for a workspace opened
+    from connection properties (SDE) a tuple of its properties"""
+    path = pWS.PathName
+    if path:
+        return os.path.normcase(os.path.abspath(path))
+    names, values = pWS.ConnectionProperties.GetAllProperties()
+    return tuple(sorted((str(n).upper(), str(v)) for n, v in zip(names, values)
+                        if str(n).upper() != 'PASSWORD'))
+
+def _datasetKey(fc):
+    """returns ((workspace key, dataset name), modified time) for a table
+    pointer, see _workspaceKey()"""
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    pDS = CType(fc, esriGeoDatabase.IDataset)
+    path = _workspaceKey(pDS.Workspace)
+    version = None
+    pDFS = CType(fc, esriGeoDatabase.IDatasetFileStat)
+    if pDFS is not None:
+        try:
+            version = pDFS.StatTime(2)
+        except:
+            pass
+    return (path, pDS.Name.lower()), version
+
+def _readSchema(fc, key, version):
+    """walks IFields once to build a Schema"""
+    tableFields = fc.Fields
+    fields = []
+    shapeField = geomType = hasZ = hasM = factoryCode = None
+    for i in range(tableFields.FieldCount):
+        pField = tableFields.Field(i)
+        pDomain = pField.Domain
+        fields.append(FieldInfo(pField.Name, pField.AliasName, i, pField.Type, pField.Length,
+                                bool(pField.IsNullable), pDomain.Name if pDomain else None))
+        if pField.Type == 7 and shapeField is None:
+            shapeField = pField.Name
+            pGeomDef = pField.GeometryDef
+            geomType, hasZ, hasM = pGeomDef.GeometryType, bool(pGeomDef.HasZ), bool(pGeomDef.HasM)
+            pSR = pGeomDef.SpatialReference
+            factoryCode = pSR.FactoryCode if pSR else None
+    oidField = fc.OIDFieldName if fc.HasOID else None
+    lookup = dict((f.name.lower(), i) for i, f in enumerate(fields))
+    return Schema(key, version, tuple(fields), oidField, shapeField,
+                  geomType, hasZ, hasM, factoryCode, lookup)
+
+def GetSchema(fc):
+    """Returns a cached Schema for a table or feature class
+
+    Schemas are cached by workspace path (or connection properties) and
+    dataset name, and are read again when the dataset's modified time
+    (IDatasetFileStat) changes or after ClearSchemaCache() is called for it.
+    Datasets without a modified time are read every time unless
+    CACHE_UNTRACKED_SCHEMAS is True.
+
+    Required:
+    fc -- ITable or IFeatureClass pointer
+    """
+    key, version = _datasetKey(fc)
+    with _schema_lock:
+        schema = _schema_cache.get(key)
+    if schema is not None and schema.version == version:
+        return schema
+    schema = _readSchema(fc, key, version)
+    if version is not None or CACHE_UNTRACKED_SCHEMAS:
+        with _schema_lock:
+            _schema_cache[key] = schema
+    return schema
+
+def ClearSchemaCache(fc=None):
+    """Invalidates cached schemas
+
+    Optional:
+    fc -- table pointer or full path to a feature class to invalidate.  Default
+        is None which clears every schema.
+    """
+    with _schema_lock:
+        if fc is None:
+            _schema_cache.clear()
+            return
+        if isinstance(fc, basestring):
+            gdb, name = os.path.split(fc)
+            key = (os.path.normcase(os.path.abspath(gdb)), name.lower())
+        else:
+            key = _datasetKey(fc)[0]
+        for k in _schema_cache.keys():
+            # SDE names may be fully qualified (database.owner.name)
+            if k[0] == key[0] and (k[1] == key[1] or k[1].endswith('.' + key[1])):
+                del _schema_cache[k]
+
+def MakeEnvelope(extent):
+    """Creates an IEnvelope from (xmin, ymin, xmax, ymax), anything else
+    (None, a geometry or an ISpatialFilter) is returned unchanged
+
+    Required:
+    extent -- (xmin, ymin, xmax, ymax) tuple or list
+
+    # example usage:
+    pEnv = MakeEnvelope((480000, 4970000, 490000, 4980000))
+    """
+    if not isinstance(extent, (tuple, list)):
+        return extent
+    import comtypes.gen.esriGeometry as esriGeometry
+    pEnv = NewObj(esriGeometry.Envelope, esriGeometry.IEnvelope)
+    pEnv.PutCoords(*extent)
+    return pEnv
+
+def MakeQueryFilter(fc, where=None, fields=None, spatial_filter=None, postfix=None):
+    """Creates an IQueryFilter (or ISpatialFilter) for a feature class
+
+    Required:
+    fc -- IFeatureClass pointer
+
+    Optional:
+    where -- where clause
+    fields -- list of field names to fetch (IQueryFilter.SubFields).  The OID
+        field is always fetched, the shape is only fetched if it is in the
+        list.  Default is None which fetches all fields.
+    spatial_filter -- an ISpatialFilter, an IGeometry to intersect with or an
+        (xmin, ymin, xmax, ymax) tuple.  An ISpatialFilter is copied (IClone)
+        and its where clause is combined with where, it is never changed
+    postfix -- postfix clause such as "ORDER BY NAME" (IQueryFilterDefinition)
+    """
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    import comtypes.gen.esriSystem as esriSystem
+    if spatial_filter is None:
+        qf = NewObj(esriGeoDatabase.QueryFilter, esriGeoDatabase.IQueryFilter)
+    elif isinstance(spatial_filter, esriGeoDatabase.ISpatialFilter):
+        qf = CType(CType(spatial_filter, esriSystem.IClone).Clone(), esriGeoDatabase.ISpatialFilter)
+        if where and qf.WhereClause:
+            where = '({0}) AND ({1})'.format(qf.WhereClause, where)
+    else:
+        qf = NewObj(esriGeoDatabase.SpatialFilter, esriGeoDatabase.ISpatialFilter)
+        qf.Geometry = MakeEnvelope(spatial_filter)
+        qf.GeometryField = fc.ShapeFieldName
+        qf.SpatialRel = esriGeoDatabase.esriSpatialRelIntersects
+    if where:
+        qf.WhereClause = where
+    if fields:
+        subFields = list(fields)
+        if fc.HasOID and fc.OIDFieldName.lower() not in [f.lower() for f in subFields]:
+            subFields.insert(0, fc.OIDFieldName)
+        qf.SubFields = ','.join(subFields)
+    if postfix:
+        qfDef = CType(qf, esriGeoDatabase.IQueryFilterDefinition)
+        qfDef.PostfixClause = postfix
+    return qf
+
+def iterFeatures(fc, recycle=True, where=None, fields=None, spatial_filter=None, postfix=None):
     """generator that iterates over features and returns an IFeature interface
 
     fc -- IFeatureClass pointer
     recycle -- option to recycle the row object.  If you want to build a list of
         IFeature row objects, set this to False.
+    where, fields, spatial_filter, postfix -- see MakeQueryFilter().  Only the
+        fields listed are fetched if fields is used.
 
     # example usage:
     pars = r'C:\TEMP\frontage_test.gdb\parcels'
@@ -399,27 +886,549 @@ def iterFeatures(fc, recycle=True):
     for ft in enum_features(fc):
         print ft.OID
     """
-    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-    qf = CreateObject(progid=esriGeoDatabase.QueryFilter, interface=esriGeoDatabase.IQueryFilter)
-    count = fc.FeatureCount(qf)
+    qf = MakeQueryFilter(fc, where, fields, spatial_filter, postfix)
     cur = fc.Search(qf, recycle)
-    for i in xrange(count):
-        yield cur.NextFeature()
+    ft = cur.NextFeature()
+    while ft:
+        yield ft
+        ft = cur.NextFeature()
 
-def SearchCursor(fc, fields):
+def SearchCursor(fc, fields, where=None, spatial_filter=None, postfix=None):
     """arcpy.da. style search cursor (does not support with statement)
 
     fc -- IFeatureCleass pointer
-    fields -- list of field names
+    fields -- list of field names, only these fields are fetched
+    where, spatial_filter, postfix -- see MakeQueryFilter()
     """
-    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-    count = fc.FeatureCount(None)
-    tableFields = fc.Fields
-    indices = [tableFields.FindField(f) for f in fields]
-    cur = fc.Search(None, True)
-    for i in xrange(count):
-        row = cur.NextFeature()
+    indices = GetSchema(fc).indices(fields)
+    cur = fc.Search(MakeQueryFilter(fc, where, fields, spatial_filter, postfix), True)
+    row = cur.NextFeature()
+    while row:
         yield tuple(row.Value(fi) for fi in indices)
+        row = cur.NextFeature()
+
+def fieldDtype(field):
+    """returns a numpy dtype string for a FieldInfo, see MAX_STRING_WIDTH"""
+    if field.type == 4:
+        if field.length > MAX_STRING_WIDTH:
+            return 'O'
+        return 'U{0}'.format(max(field.length, 1))
+    return FIELD_DTYPES.get(field.type, 'O')
+
+class ChunkReader(object):
+    """Reads features from a cursor into numpy structured arrays
+
+    Required:
+    fc -- IFeatureClass pointer
+    fields -- list of field names
+
+    Optional:
+    null_value -- see ChunkedSearchCursor()
+    """
+    def __init__(self, fc, fields, null_value=None):
+        import numpy
+        self.fields = list(fields)
+        schema = GetSchema(fc)
+        info = [schema.field(f) for f in self.fields]
+        self.indices = [fi.index for fi in info]
+        self.dtype = numpy.dtype([(str(f), fieldDtype(fi)) for f, fi in zip(self.fields, info)])
+        self.shapeField = [fi.type == 7 for fi in info]
+        self.nulls = null_substitutes(self.dtype, null_value)
+
+    def read(self, cur, chunk_size, oids=None):
+        """reads up to chunk_size features from an IFeatureCursor, a shorter
+        array means the cursor is exhausted
+
+        Optional:
+        oids -- list to append the OID of each feature read to
+        """
+        import numpy
+        dtype, indices, nulls, shapeField = self.dtype, self.indices, self.nulls, self.shapeField
+        chunk = numpy.empty(chunk_size, dtype)
+        n = 0
+        while n < chunk_size:
+            row = cur.NextFeature()
+            if not row:
+                break
+            values = []
+            for i, fi in enumerate(indices):
+                if shapeField[i]:
+                    # feature is recycled, so the shape must be copied
+                    val = row.ShapeCopy
+                else:
+                    val = row.Value(fi)
+                if val is None:
+                    val = nulls[i]
+                    if val is None and dtype[i].kind in 'iu':
+                        raise ValueError('Null found in integer field "{}", use null_value!'.format(dtype.names[i]))
+                values.append(val)
+            chunk[n] = tuple(values)
+            if oids is not None:
+                oids.append(row.OID)
+            n += 1
+        if n < chunk_size:
+            return chunk[:n]
+        return chunk
+
+    def chunks(self, cur, chunk_size):
+        """generator of arrays from read() until the cursor is exhausted"""
+        while True:
+            chunk = self.read(cur, chunk_size)
+            if len(chunk):
+                yield chunk
+            if len(chunk) < chunk_size:
+                break
+
+def ChunkedSearchCursor(fc, fields, chunk_size=10000, null_value=None,
+                        where=None, spatial_filter=None, postfix=None):
+    """search cursor that yields numpy structured arrays of up to chunk_size rows
+
+    Required:
+    fc -- IFeatureClass pointer
+    fields -- list of field names
+
+    Optional:
+    chunk_size -- number of rows per array.  Default is 10000
+    null_value -- value to substitute for nulls, either a single value or a
+        dictionary of {field_name: value}.  Null floats, dates and strings
+        default to nan, NaT and an empty string, a null in an integer field
+        with no substitute will raise a ValueError.  String fields wider than
+        MAX_STRING_WIDTH are object fields, with None for nulls.
+    where, spatial_filter, postfix -- see MakeQueryFilter()
+
+    The arrays are filled until NextFeature() is exhausted, no feature count is
+    done beforehand.  The last chunk is truncated to the rows that were read.
+
+    # example usage:
+    for chunk in ChunkedSearchCursor(fc, ['OID', 'ACRES']):
+        print chunk['ACRES'].sum()
+    """
+    reader = ChunkReader(fc, fields, null_value)
+    cur = fc.Search(MakeQueryFilter(fc, where, fields, spatial_filter, postfix), True)
+    for chunk in reader.chunks(cur, chunk_size):
+        yield chunk
+
+class InsertCursor(object):
+    """arcpy.da. style insert cursor using a buffered IFeatureCursor and a
+    reused IFeatureBuffer
+
+    Required:
+    fc -- IFeatureClass pointer
+    fields -- list of field names, a geometry field is written through the
+        buffer's Shape property
+
+    Optional:
+    flush_interval -- number of rows between calls to Flush().  Default is 1000
+    load_only -- put the feature class in load only mode while inserting, this
+        requires an exclusive schema lock.  Default is False
+
+    # example usage:
+    with InsertCursor(fc, ['NAME', 'ACRES', 'Shape'], load_only=True) as cur:
+        cur.insertRows(rows)
+    print cur.report()
+    """
+    def __init__(self, fc, fields, flush_interval=1000, load_only=False):
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        self.fc = fc
+        self.fields = list(fields)
+        self.flush_interval = flush_interval
+        self.rows = 0
+        self.elapsed = 0.0
+        schema = GetSchema(fc)
+        self._indices = schema.indices(self.fields)
+        self._shape = [schema.field(f).type == 7 for f in self.fields]
+
+        self._load = None
+        if load_only:
+            pSchemaLock = CType(fc, esriGeoDatabase.ISchemaLock)
+            pSchemaLock.ChangeSchemaLock(esriGeoDatabase.esriExclusiveSchemaLock)
+            self._load = CType(fc, esriGeoDatabase.IFeatureClassLoad)
+            self._load.LoadOnlyMode = True
+
+        self._buffer = fc.CreateFeatureBuffer()
+        self._cursor = fc.Insert(True)
+        self._pending = 0
+        self._start = time.time()
+
+    def insertRow(self, row):
+        """inserts a row (sequence of values in field order), returns the new OID"""
+        buf = self._buffer
+        for i, val in enumerate(row):
+            if self._shape[i]:
+                buf.Shape = val
+            else:
+                if isinstance(val, float) and val != val:
+                    # nan is how nulls come out of ChunkedSearchCursor
+                    val = None
+                buf.Value[self._indices[i]] = val
+        oid = self._cursor.InsertFeature(buf)
+        self.rows += 1
+        self._pending += 1
+        if self.flush_interval and self._pending >= self.flush_interval:
+            self.Flush()
+        return oid
+
+    @staticmethod
+    def _arrayRows(arr, null_value=None, shape=None):
+        """returns the rows of a structured array as lists, values equal to
+        their field's null substitute are None when null_value is given"""
+        rows = arr.tolist()
+        if null_value is None:
+            # nan and NaT already come out of tolist() as nulls
+            return rows
+        subs = [(i, sub) for i, sub in enumerate(null_substitutes(arr.dtype, null_value))
+                if sub is not None and not (shape and shape[i]) and arr.dtype[i].kind not in 'fM']
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for i, sub in subs:
+                if row[i] == sub:
+                    row[i] = None
+        return rows
+
+    def insertRows(self, rows, null_value=None):
+        """inserts rows from a numpy structured array, a list of row tuples, or
+        any iterable that yields either, returns the number of rows inserted
+
+        Optional:
+        null_value -- null substitutes used in the arrays, see
+            ChunkedSearchCursor().  When it is given, array values equal to a
+            field's substitute (including empty strings for string fields
+            without their own substitute) are inserted as nulls.  nan and NaT
+            are always inserted as nulls.
+        """
+        count = self.rows
+        if hasattr(rows, 'dtype'):
+            rows = [rows]
+        for chunk in rows:
+            if hasattr(chunk, 'dtype'):
+                chunk = chunk[[str(f) for f in self.fields]]
+                for row in self._arrayRows(chunk, null_value, self._shape):
+                    self.insertRow(row)
+            else:
+                self.insertRow(chunk)
+        return self.rows - count
+
+    def insertShapes(self, shapes, attributes=None, simplify=False, default_z=0.0,
+                     null_value=None):
+        """inserts features built from numpy coordinate arrays, the shape field
+        must be in the cursor's fields
+
+        Required:
+        shapes -- GeometryArrays tuple, see arcobjects.geometry.NumPyToShapes()
+
+        Optional:
+        attributes -- numpy structured array with the other fields, one row per shape
+        simplify -- simplify each shape before it is inserted.  Default is False
+        default_z -- Z value of every vertex for a feature class with Z values.
+            Default is 0.  Shapes are made Z and M aware to match the feature class.
+        null_value -- null substitutes used in attributes, see insertRows()
+
+        returns the number of rows inserted
+        """
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        from arcobjects import geometry
+        if True not in self._shape:
+            raise ValueError('The shape field is not in the cursor fields!')
+        shapeIndex = self._shape.index(True)
+        pSR = CType(self.fc, esriGeoDatabase.IGeoDataset).SpatialReference
+        schema = GetSchema(self.fc)
+        geoms = geometry.NumPyToShapes(shapes, spatial_reference=pSR, simplify=simplify,
+                                       has_z=schema.has_z, has_m=schema.has_m, default_z=default_z)
+        names = [str(f) for i, f in enumerate(self.fields) if i != shapeIndex]
+        if names:
+            if attributes is None or len(attributes) != len(geoms):
+                raise ValueError('attributes must have one row per shape!')
+            rows = self._arrayRows(attributes[names], null_value)
+        else:
+            rows = [()] * len(geoms)
+        count = self.rows
+        for shape, row in zip(geoms, rows):
+            row = list(row)
+            row.insert(shapeIndex, shape)
+            self.insertRow(row)
+        return self.rows - count
+
+    def Flush(self):
+        """writes the buffered features to the database"""
+        if self._cursor is not None and self._pending:
+            self._cursor.Flush()
+        self._pending = 0
+        self.elapsed = time.time() - self._start
+
+    def _elapsed(self):
+        """seconds since the cursor was opened, or until it was closed"""
+        if self._cursor is None:
+            return self.elapsed
+        return time.time() - self._start
+
+    @property
+    def rowsPerSecond(self):
+        """average insert rate so far"""
+        elapsed = self._elapsed()
+        if not elapsed:
+            return 0.0
+        return self.rows / elapsed
+
+    def report(self):
+        """returns a summary of the load"""
+        return '{0} rows in {1:.1f} seconds ({2:.0f} rows/sec)'.format(
+            self.rows, self._elapsed(), self.rowsPerSecond)
+
+    def close(self):
+        """flushes remaining features and takes the feature class out of load only mode"""
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        if self._cursor is None:
+            return
+        try:
+            self.Flush()
+        finally:
+            self._cursor = None
+            self._buffer = None
+            if self._load is not None:
+                self._load.LoadOnlyMode = False
+                pSchemaLock = CType(self.fc, esriGeoDatabase.ISchemaLock)
+                pSchemaLock.ChangeSchemaLock(esriGeoDatabase.esriSharedSchemaLock)
+                self._load = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def _changedCells(before, after):
+    """returns a boolean array that is True where after differs from before,
+    nulls (nan and NaT) are equal to each other and objects are compared by identity"""
+    import numpy
+    kind = before.dtype.kind
+    if kind == 'O' or after.dtype.kind == 'O':
+        return numpy.array([a is not b for a, b in zip(before, after)], bool)
+    diff = numpy.asarray(before != after)
+    if kind in 'fM' and after.dtype.kind == kind:
+        diff &= ~(null_mask(before) & null_mask(after))
+    return diff
+
+def _oidFilter(fc, after=None, upto=None, where=None, fields=None, spatial_filter=None):
+    """returns an IQueryFilter for OIDs in the range (after, upto] ordered by OID"""
+    oidField = fc.OIDFieldName
+    clauses = ['({0})'.format(where)] if where else []
+    if after is not None:
+        clauses.append('{0} > {1}'.format(oidField, int(after)))
+    if upto is not None:
+        clauses.append('{0} <= {1}'.format(oidField, int(upto)))
+    return MakeQueryFilter(fc, ' AND '.join(clauses), fields, spatial_filter,
+                           postfix='ORDER BY {0}'.format(oidField))
+
+class UpdateCursor(object):
+    """Batched update cursor with edit session and commit control
+
+    Features are read in OID order, chunk_size at a time, through a recycling
+    IFeatureClass.Update cursor and written back with UpdateFeature.  Each
+    chunk is one edit operation, and the edit session is saved and restarted
+    every commit_interval rows so long updates are neither one huge
+    transaction nor a commit per row.
+
+    Required:
+    fc -- IFeatureClass pointer
+    fields -- list of field names
+
+    Optional:
+    chunk_size -- number of rows per edit operation.  Default is 1000
+    commit_interval -- number of rows between saves.  Default is 10000,
+        None only saves when the cursor is closed
+    edit_session -- start an edit session on the workspace.  Default is True
+    versioned -- for enterprise geodatabases, True edits in
+        esriMESMVersioned mode and False in esriMESMNonVersioned mode through
+        IMultiuserWorkspaceEdit.  Default is None which uses IWorkspaceEdit
+        for a single user edit session.
+    null_value -- null substitutes for transform chunks, see ChunkedSearchCursor()
+    where -- where clause to limit the features updated
+
+    # example usage:
+    def upper(row):
+        return [row[0].upper()]
+
+    with UpdateCursor(fc, ['NAME']) as cur:
+        cur.updateRows(upper)
+
+    # vectorized
+    def acres(chunk):
+        chunk['ACRES'] = chunk['SQFT'] / 43560.0
+        return chunk
+
+    with UpdateCursor(fc, ['SQFT', 'ACRES']) as cur:
+        cur.updateRows(transform=acres)
+    """
+    def __init__(self, fc, fields, chunk_size=1000, commit_interval=10000,
+                 edit_session=True, versioned=None, null_value=None, where=None):
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        if not fc.HasOID:
+            raise ValueError('UpdateCursor requires a feature class with an OID field!')
+        self.fc = fc
+        self.fields = list(fields)
+        self.chunk_size = chunk_size
+        self.commit_interval = commit_interval
+        self.versioned = versioned
+        self.null_value = null_value
+        self.where = where
+        self.rows = 0
+        self.commits = 0
+        self.last_oid = None
+        schema = GetSchema(fc)
+        self._indices = schema.indices(self.fields)
+        self._shape = [schema.field(f).type == 7 for f in self.fields]
+        self._uncommitted = 0
+
+        self._edit = None
+        if edit_session:
+            pWS = CType(fc, esriGeoDatabase.IDataset).Workspace
+            self._edit = CType(pWS, esriGeoDatabase.IWorkspaceEdit)
+            self._multiuser = CType(pWS, esriGeoDatabase.IMultiuserWorkspaceEdit)
+            self._startEditing()
+
+    def _startEditing(self):
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        if self.versioned is None:
+            self._edit.StartEditing(False)
+        else:
+            mode = (esriGeoDatabase.esriMESMVersioned if self.versioned
+                    else esriGeoDatabase.esriMESMNonVersioned)
+            self._multiuser.StartMultiuserEditing(mode)
+
+    def Commit(self):
+        """saves edits made so far and starts a new edit session"""
+        if self._edit is not None and self._edit.IsBeingEdited():
+            self._edit.StopEditing(True)
+            self._startEditing()
+        self._uncommitted = 0
+        self.commits += 1
+
+    def _write(self, feature, values, columns=None):
+        """sets values on a feature, columns are the positions in fields of the
+        values if only some fields are written"""
+        if columns is None:
+            columns = range(len(values))
+        for i, val in zip(columns, values):
+            if self._shape[i]:
+                feature.Shape = val
+            else:
+                if isinstance(val, float) and val != val:
+                    val = None
+                feature.Value[self._indices[i]] = val
+
+    def _updateChunk(self, func):
+        """applies func to the next chunk_size features, returns number read"""
+        cur = self.fc.Update(_oidFilter(self.fc, self.last_oid, where=self.where,
+                                            fields=self.fields), True)
+        n = 0
+        while n < self.chunk_size:
+            feature = cur.NextFeature()
+            if not feature:
+                break
+            row = [feature.Value(fi) for fi in self._indices]
+            values = func(row)
+            if values is not None:
+                self._write(feature, values)
+                cur.UpdateFeature(feature)
+            self.last_oid = feature.OID
+            n += 1
+        del cur
+        return n
+
+    def _transformChunk(self, transform, reader):
+        """applies a vectorized transform to the next chunk_size features,
+        returns number read"""
+        import numpy
+        oids = []
+        search = self.fc.Search(_oidFilter(self.fc, self.last_oid, where=self.where,
+                                               fields=self.fields), True)
+        chunk = reader.read(search, self.chunk_size, oids)
+        del search
+        if not len(chunk):
+            return 0
+        original = chunk.copy()
+        result = transform(chunk)
+        if result is None:
+            result = chunk
+        if len(result) != len(chunk):
+            raise ValueError('transform must return the same number of rows!')
+
+        # only cells the transform changed are written, so null substitutes in
+        # the other cells never overwrite nulls
+        names = list(reader.dtype.names)
+        changed = numpy.column_stack([_changedCells(original[n], result[n]) for n in names])
+        byOID = {}
+        for oid, row, mask in zip(oids, result[names].tolist(), changed):
+            if mask.any():
+                columns = numpy.flatnonzero(mask).tolist()
+                byOID[oid] = (columns, [row[i] for i in columns])
+
+        # write back in the same OID order
+        if byOID:
+            cur = self.fc.Update(_oidFilter(self.fc, self.last_oid, oids[-1], self.where,
+                                            self.fields), True)
+            feature = cur.NextFeature()
+            while feature:
+                cells = byOID.get(feature.OID)
+                if cells is not None:
+                    self._write(feature, cells[1], cells[0])
+                    cur.UpdateFeature(feature)
+                feature = cur.NextFeature()
+            del cur
+        self.last_oid = oids[-1]
+        return len(chunk)
+
+    def updateRows(self, func=None, transform=None):
+        """updates every feature, returns the number of rows processed
+
+        Optional (need to use one of these):
+        func -- called with a list of values in field order for each row, return
+            the new values or None to leave the row unchanged
+        transform -- called with a numpy structured array for each chunk,
+            return the updated array (or None if it was modified in place).
+            Only the cells it changes are written back, so nulls (read as
+            their null substitutes) in other cells are left as they are.
+        """
+        if func is None and transform is None:
+            raise ValueError('func or transform is required!')
+        reader = ChunkReader(self.fc, self.fields, self.null_value) if transform else None
+        while True:
+            if self._edit is not None:
+                self._edit.StartEditOperation()
+            try:
+                if transform is not None:
+                    n = self._transformChunk(transform, reader)
+                else:
+                    n = self._updateChunk(func)
+            except:
+                if self._edit is not None:
+                    self._edit.AbortEditOperation()
+                raise
+            if self._edit is not None:
+                self._edit.StopEditOperation()
+            self.rows += n
+            self._uncommitted += n
+            if self.commit_interval and self._uncommitted >= self.commit_interval:
+                self.Commit()
+            if n < self.chunk_size:
+                break
+        return self.rows
+
+    def close(self, save=True):
+        """stops the edit session
+
+        Optional:
+        save -- save edits since the last commit.  Default is True
+        """
+        if self._edit is not None and self._edit.IsBeingEdited():
+            self._edit.StopEditing(save)
+        self._edit = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close(save=exc_type is None)
 
 def unregisterReplica(ws, replicaName=None, replicaID=None, replicaGUID=None):
     """Unregisters a replica from a database
@@ -489,18 +1498,11 @@ def GetModifiedDate(fc, statType=2):
     modified from:
         https://geonet.esri.com/thread/74409
     """
-    InitStandalone()
-    import comtypes.gen.esriSystem as esriSystem
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-    import comtypes.gen.esriDataSourcesGDB as esriDataSourcesGDB
 
     # Open the FGDB
     gdb, tableName = os.path.split(fc)
-    pWS = Standalone_OpenFileGDB(gdb)
-
-    # Create empty Properties Set
-    pPropSet = NewObj(esriSystem.PropertySet, esriSystem.IPropertySet)
-    pPropSet.SetProperty("database", gdb)
+    pWS = OpenWorkspace(gdb)
 
     # Cast the FGDB as IFeatureWorkspace
     pFW = CType(pWS, esriGeoDatabase.IFeatureWorkspace)
@@ -515,10 +1517,221 @@ def GetModifiedDate(fc, statType=2):
     mod = datetime.datetime.fromtimestamp(pDFS.StatTime(statType)).strftime('%Y-%m-%d %H:%M:%S')
     return (ACCESS_MODE[pDFS.StatMode], getUnitSize(pDFS.StatSize), mod)
 
+# stat info for one table or feature class, times are seconds since the epoch
+DatasetStat = collections.namedtuple('DatasetStat', 'name type feature_dataset mode size '
+                                                    'accessed created modified')
+
+def GetDatasetStats(sPath, types=None):
+    """Gets stat info for every table and feature class in a geodatabase
+
+    The workspace is opened once and its datasets (including those in feature
+    datasets) are enumerated with IWorkspace.Datasets, reading IDatasetFileStat
+    from each dataset object instead of opening every table by name.
+
+    Required:
+        sPath -- path to File Geodatabase
+
+    Optional:
+        types -- esriDatasetType codes to report.  Default is None for
+            esriDTTable and esriDTFeatureClass (relationship classes,
+            topologies and other dataset types are left out)
+
+    returns a list of DatasetStat tuples, size is in bytes (see getUnitSize())
+
+    # example usage:
+    for stat in GetDatasetStats(r'C:\TEMP\parcels.gdb'):
+        print stat.name, getUnitSize(stat.size), datetime.datetime.fromtimestamp(stat.modified)
+    """
+    if not os.path.exists(sPath):
+        raise IOError('"{}" does not exist!'.format(sPath))
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    if types is None:
+        types = (esriGeoDatabase.esriDTTable, esriGeoDatabase.esriDTFeatureClass)
+    types = set(types)
+    pWS = OpenWorkspace(sPath)
+    stats = []
+
+    def walk(pEnum, featureDataset=None):
+        pEnum.Reset()
+        pDS = pEnum.Next()
+        while pDS:
+            if pDS.Type == esriGeoDatabase.esriDTFeatureDataset:
+                walk(pDS.Subsets, pDS.Name)
+            elif pDS.Type in types:
+                pDFS = CType(pDS, esriGeoDatabase.IDatasetFileStat)
+                if pDFS is not None:
+                    stats.append(DatasetStat(pDS.Name, pDS.Type, featureDataset,
+                                             ACCESS_MODE.get(pDFS.StatMode, 'unknown'), pDFS.StatSize,
+                                             pDFS.StatTime(0), pDFS.StatTime(1), pDFS.StatTime(2)))
+            pDS = pEnum.Next()
+    walk(pWS.Datasets(esriGeoDatabase.esriDTAny))
+    return stats
+
 #**** ArcMap ****
 
-def MapRefresh(current=True):
-    """refreshes ArcMap's TOC and active view"""
+class SymbolCache(object):
+    """LRU cache of symbol and color prototypes keyed by style
+
+    Creating a symbol from ArcMap means a cross process IObjectFactory.Create
+    call for every color, font and symbol object plus one call per property.
+    The cache keeps one prototype per style tuple, such as ('text', rgb, font,
+    size, bold, mask), and hands out IClone copies so callers can change their
+    copy without touching the prototype.  Prototypes belong to the application
+    they were created in, call Clear() when switching between applications.
+
+    Optional:
+    max_size -- number of prototypes to keep.  Default is 64
+    """
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self._prototypes = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _clone(self, pProto, interface):
+        import comtypes.gen.esriSystem as esriSystem
+        return CType(CType(pProto, esriSystem.IClone).Clone(), interface)
+
+    def Get(self, key, creator, interface):
+        """returns a copy of the prototype for key, calling creator() to build
+        the prototype if it is not cached
+
+        Required:
+        key -- hashable style tuple
+        creator -- function returning a new symbol or color
+        interface -- interface to cast the copy to
+        """
+        with self._lock:
+            pProto = self._prototypes.pop(key, None)
+        if pProto is not None:
+            try:
+                pCopy = self._clone(pProto, interface)
+                self.hits += 1
+            except comtypes.COMError:
+                # the application that owned the prototype has gone away
+                pProto = None
+        if pProto is None:
+            self.misses += 1
+            pProto = creator()
+            pCopy = self._clone(pProto, interface)
+        with self._lock:
+            self._prototypes[key] = pProto
+            while len(self._prototypes) > self.max_size:
+                self._prototypes.popitem(last=False)
+        return pCopy
+
+    def Clear(self):
+        """removes every prototype"""
+        with self._lock:
+            self._prototypes.clear()
+
+    def __contains__(self, key):
+        return key in self._prototypes
+
+    def __len__(self):
+        return len(self._prototypes)
+
+SYMBOL_CACHE = SymbolCache()
+
+class RefreshCoordinator(object):
+    """Coalesces ArcMap view and table of contents refreshes
+
+    Helpers record what needs to be redrawn with Invalidate() and
+    InvalidateContents() instead of refreshing themselves.  Outside of a with
+    block the refresh happens right away.  Inside one the requests are merged
+    and flushed once when the outermost block exits: draw phases are combined
+    and their envelopes unioned into a single PartialRefresh call per view, and
+    UpdateContents is called once per document.
+
+    # example usage:
+    with REFRESH:
+        for name in ('roads', 'parcels', 'lakes'):
+            importSymbologyFromLayer(pMxDoc, name, 'TYPE', name + '_symbology')
+    """
+    def __init__(self):
+        self._views = collections.OrderedDict()
+        self._contents = collections.OrderedDict()
+        self._depth = 0
+
+    @property
+    def deferred(self):
+        """True inside a with block"""
+        return self._depth > 0
+
+    def Invalidate(self, pAV, phase=None, envelope=None):
+        """marks part of an active view as needing to be redrawn
+
+        Required:
+        pAV -- IActiveView pointer
+
+        Optional:
+        phase -- esriViewDrawPhase value, or several added together.  Default
+            is None which redraws everything with IActiveView.Refresh
+        envelope -- IEnvelope to redraw.  Default is None for the whole view
+        """
+        import comtypes.gen.esriGeometry as esriGeometry
+        key = CType(pAV, comtypes.IUnknown)
+        if key not in self._views:
+            # [view, phases, envelope, whole view, full refresh]
+            self._views[key] = [pAV, 0, None, False, False]
+        pending = self._views[key]
+        if phase is None:
+            pending[4] = True
+        else:
+            pending[1] |= phase
+            if envelope is None:
+                pending[3] = True
+            elif pending[2] is None:
+                # copy so later unions do not change the caller's envelope
+                pending[2] = CType(envelope, esriGeometry.IGeometry).Envelope
+            else:
+                pending[2].Union(envelope)
+        if not self._depth:
+            self.Flush()
+
+    def InvalidateContents(self, pMxDoc):
+        """marks the table of contents of an IMxDocument as needing an update"""
+        self._contents[CType(pMxDoc, comtypes.IUnknown)] = pMxDoc
+        if not self._depth:
+            self.Flush()
+
+    def Flush(self):
+        """redraws everything that has been invalidated"""
+        views, self._views = self._views, collections.OrderedDict()
+        contents, self._contents = self._contents, collections.OrderedDict()
+        for pAV, phases, pEnv, whole, full in views.itervalues():
+            if full:
+                pAV.Refresh()
+            else:
+                pAV.PartialRefresh(phases, None, None if whole else pEnv)
+        for pMxDoc in contents.itervalues():
+            pMxDoc.UpdateContents()
+
+    def Discard(self):
+        """forgets everything that has been invalidated without redrawing"""
+        self._views.clear()
+        self._contents.clear()
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, *args):
+        self._depth -= 1
+        if not self._depth:
+            self.Flush()
+
+REFRESH = RefreshCoordinator()
+
+def MapRefresh(current=True, phase=None, envelope=None):
+    """refreshes ArcMap's TOC and active view through REFRESH, inside a
+    with REFRESH block this only happens once when the block exits
+
+    Optional:
+    phase -- esriViewDrawPhase to redraw.  Default is None for a full refresh
+    envelope -- IEnvelope to redraw.  Default is None for the whole view
+    """
     from comtypes.gen import esriArcMapUI
 
     # reresh active view and TOC
@@ -528,8 +1741,8 @@ def MapRefresh(current=True):
         pApp = GetApp()
     pDoc = pApp.Document
     pMxDoc = CType(pDoc, esriArcMapUI.IMxDocument)
-    pMxDoc.UpdateContents()
-    pMxDoc.ActiveView.Refresh()
+    REFRESH.InvalidateContents(pMxDoc)
+    REFRESH.Invalidate(pMxDoc.ActiveView, phase, envelope)
     del pApp, pMxDoc
     return
 
@@ -655,8 +1868,14 @@ def ArcCatalog_GetSelectedTable(bStandalone=False):
     print "Selected table: " + pDS.Name
 
 # **** custom helper functions ****
-def getLayer(pApp, layer_name):
-    """ get a layer by name"""
+def getLayer(pApp, layer_name, index=None):
+    """ get a layer by name
+
+    Optional:
+    index -- LayerIndex to look the layer up in instead of walking the map
+    """
+    if index is not None:
+        return index.Get(layer_name)
     pApp = GetMxDoc(pApp)
     for lyr in iterLayers(pApp):
         if lyr.Name == layer_name:
@@ -713,6 +1932,120 @@ def iterLayers(pApp=None, filterer=[], iterGroups=True):
         # reference layer
         return getSubLayers(pMap, filterer, iterGroups)
 
+class LayerIndex(object):
+    """Snapshot of the layers in a map for repeated lookups
+
+    The map is walked once, recording every layer by name and by group path
+    (for example "Utilities\\Water\\Mains") along with group layers and data
+    sources.  The snapshot is rebuilt on the next lookup after a layer is added
+    or removed (IActiveViewEvents) or after Refresh() is called.
+
+    Required:
+    pMxDoc -- anything accepted by GetMxDoc()
+
+    Optional:
+    listen -- invalidate the snapshot from IActiveViewEvents.  Default is True
+
+    Attributes:
+    byName -- {layer name: [ILayer, ...]} in TOC order
+    byPath -- {group path: ILayer}
+    groups -- {group path: IGroupLayer}
+    sources -- {group path: (workspace path, dataset name)} for layers with an IDataset
+
+    # example usage:
+    index = LayerIndex('current')
+    parcels = index.Get('Parcels')
+    mains = index.Get('Utilities\\Water\\Mains')
+    """
+    SEPARATOR = '\\'
+
+    def __init__(self, pMxDoc, listen=True):
+        from comtypes.gen import esriArcMapUI
+        pMxDoc = GetMxDoc(pMxDoc)
+        if isinstance(pMxDoc, esriArcMapUI.IMxDocument):
+            self.pMap = pMxDoc.FocusMap
+        else:
+            self.pMap = pMxDoc.Map(0)
+        self.byName = {}
+        self.byPath = {}
+        self.groups = {}
+        self.sources = {}
+        self.stale = True
+        self._connection = None
+        if listen:
+            self.Listen()
+        self.Refresh()
+
+    def Refresh(self):
+        """rebuilds the snapshot in one traversal of the map"""
+        from comtypes.gen import esriCarto, esriGeoDatabase
+        byName, byPath, groups, sources = {}, {}, {}, {}
+
+        def walk(pLayers, count, prefix):
+            for i in range(count):
+                layer = pLayers.Layer(i)
+                name = layer.Name
+                path = prefix + name
+                byName.setdefault(name, []).append(layer)
+                byPath.setdefault(path, layer)
+                gl = CType(layer, esriCarto.IGroupLayer)
+                if gl:
+                    groups[path] = gl
+                    cl = CType(gl, esriCarto.ICompositeLayer)
+                    walk(cl, cl.Count, path + self.SEPARATOR)
+                    continue
+                pDS = CType(layer, esriGeoDatabase.IDataset)
+                if pDS:
+                    try:
+                        sources[path] = (pDS.Workspace.PathName, pDS.Name)
+                    except:
+                        # broken data source
+                        sources[path] = (None, None)
+
+        walk(self.pMap, self.pMap.LayerCount, '')
+        self.byName, self.byPath, self.groups, self.sources = byName, byPath, groups, sources
+        self.stale = False
+
+    def Get(self, name):
+        """returns a layer by group path or by name (first in TOC order), or None"""
+        if self.stale:
+            self.Refresh()
+        if name in self.byPath:
+            return self.byPath[name]
+        layers = self.byName.get(name)
+        return layers[0] if layers else None
+
+    def __getitem__(self, name):
+        layer = self.Get(name)
+        if layer is None:
+            raise KeyError(name)
+        return layer
+
+    def __contains__(self, name):
+        return self.Get(name) is not None
+
+    def Listen(self):
+        """invalidates the snapshot when the map's layers change"""
+        from comtypes.gen import esriCarto
+        from comtypes.client import GetEvents
+        if self._connection is None:
+            pAV = CType(self.pMap, esriCarto.IActiveView)
+            self._connection = GetEvents(pAV, self, esriCarto.IActiveViewEvents)
+
+    def Unlisten(self):
+        """stops listening for map events"""
+        self._connection = None
+
+    # IActiveViewEvents
+    def ItemAdded(self, this, Item):
+        self.stale = True
+
+    def ItemDeleted(self, this, Item):
+        self.stale = True
+
+    def ContentsCleared(self, this):
+        self.stale = True
+
 def clearReferenceScale(layer):
     """clears a refernce scale for a layer"""
     from comtypes.gen import esriArcMapUI, esriCarto
@@ -743,6 +2076,7 @@ def importSymbologyFromLayer(pMxDoc, target_layer, target_field, symbol_layer, n
     import comtypes.gen.esriCarto as esriCarto
     import comtypes.gen.esriFramework as esriFramework
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    import comtypes.gen.esriSystem as esriSystem
 
     # validate/get proper map document instance
     pMxDoc = GetMxDoc(pMxDoc)
@@ -750,9 +2084,13 @@ def importSymbologyFromLayer(pMxDoc, target_layer, target_field, symbol_layer, n
     # get IMapPointer
     pMap = pMxDoc.FocusMap
 
-    # get layer references
-    targ_lyr = [pMap.Layer(i) for i in range(pMap.LayerCount) if pMap.Layer(i).Name == target_layer][0]
-    symb_lyr = [pMap.Layer(i) for i in range(pMap.LayerCount) if pMap.Layer(i).Name == symbol_layer][0]
+    # get layer references, one pass over the top level layers
+    topLayers = {}
+    for i in range(pMap.LayerCount):
+        lyr = pMap.Layer(i)
+        topLayers.setdefault(lyr.Name, lyr)
+    targ_lyr = topLayers[target_layer]
+    symb_lyr = topLayers[symbol_layer]
 
     # cast to IGeoFeatureLayer interface and get renderers
     targGeo = CType(targ_lyr, esriCarto.IGeoFeatureLayer)
@@ -768,32 +2106,25 @@ def importSymbologyFromLayer(pMxDoc, target_layer, target_field, symbol_layer, n
 
     if isinstance(symbClassBreaks, esriCarto.IClassBreaksRenderer):
 
-        # cast to IClassBreaksRenderer
-        targSymb = NewObj(esriCarto.ClassBreaksRenderer, esriCarto.IClassBreaksRenderer)
+        # copy breaks, descriptions, symbols and labels with one clone instead
+        # of four calls per break
+        pClone = CType(symbClassBreaks, esriSystem.IClone).Clone()
+        targSymb = CType(pClone, esriCarto.IClassBreaksRenderer)
 
         # set target symbology field
         targSymb.Field = target_field
         targSymb.NormField = normalization_field
-        targSymb.BreakCount = symbClassBreaks.BreakCount
-
-        # iterate through class beraks from symbol layer and apply to target
-        for i in range(symbClassBreaks.BreakCount):
-            targSymb.Break[i] = symbClassBreaks.Break[i]
-            targSymb.Description[i] = symbClassBreaks.Description[i]
-            targSymb.Symbol[i] = symbClassBreaks.Symbol[i]
-            targSymb.Label[i] = symbClassBreaks.Label[i]
 
     # ***********************************************************************************
     #
     # UniqueValuesRenderer
     elif isinstance(symbUnique, esriCarto.IUniqueValueRenderer):
-        targSymb = NewObj(esriCarto.UniqueValueRenderer, esriCarto.IUniqueValueRenderer)
-
-        # add all values from symbol layer
+        # copy all values, headings and symbols from symbol layer with one clone
+        pClone = CType(symbUnique, esriSystem.IClone).Clone()
+        targSymb = CType(pClone, esriCarto.IUniqueValueRenderer)
         targGeo.Field = target_field
-
-        for i in range(symbUnique.ValueCount):
-            targSymb.AddValue(symbUnique.Value[i], symbUnique.Heading(symbUnique.Value[i]), symbUnique.Symbol(symbUnique.Value[i]))
+        targSymb.FieldCount = 1
+        targSymb.Field[0] = target_field
 
     # ***********************************************************************************
     #
@@ -815,9 +2146,10 @@ def importSymbologyFromLayer(pMxDoc, target_layer, target_field, symbol_layer, n
         # create legend symbolss
         targSymb.CreateLegendSymbols()
 
+    # only the layers and TOC need to be redrawn
     targGeo.Renderer = targSymb
-    pMxDoc.ActiveView.Refresh()
-    pMxDoc.UpdateContents()
+    REFRESH.Invalidate(pMxDoc.ActiveView, esriCarto.esriViewGeography)
+    REFRESH.InvalidateContents(pMxDoc)
     return targSymb
 
 def setSymbolSize(pMapDocument, layer_names=[], pointSize=12, lineWidth=1, autoSave=True, do_all=False, clearRefScale=True):
@@ -883,65 +2215,169 @@ def setSymbolSize(pMapDocument, layer_names=[], pointSize=12, lineWidth=1, autoS
                     elif flyr.ShapeType == 3 and lineWidth is not None:
                         marker.Width = lineWidth
 
-    # refresh Map
-    pMapDocument.ActiveView.Refresh()
-
-    # save and close map
+    # save and close map, the document is not displayed so it is not redrawn
     if autoSave in (True, 1):
         pMapDocument.Save()
     pMapDocument.Close()
     del pMap, pMapDocument
     return
 
-def alter_alias(fc, f_dict):
-    """Change field names at the database level
+# one schema change for AlterSchema(), kind is one of SCHEMA_CHANGES
+SchemaChange = collections.namedtuple('SchemaChange', 'kind field value')
+
+# AlterSchema() result, failed is a list of (SchemaChange, error message)
+SchemaEditResult = collections.namedtuple('SchemaEditResult', 'table applied failed')
+
+SCHEMA_CHANGES = ('alias', 'name', 'default', 'domain')
+
+def _schemaChanges(changes):
+    """returns a list of SchemaChange from a list of (kind, field, value) or a
+    dictionary of {kind: {field: value}}"""
+    if isinstance(changes, dict):
+        changes = [(kind, field, value) for kind in SCHEMA_CHANGES
+                   for field, value in changes.get(kind, {}).iteritems()]
+    changes = [SchemaChange(*c) for c in changes]
+    for change in changes:
+        if change.kind not in SCHEMA_CHANGES:
+            raise ValueError('"{}" is not a valid schema change!'.format(change.kind))
+    return changes
+
+def _openTable(fc):
+    """returns an ITable for a table pointer or a full path"""
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    if not isinstance(fc, basestring):
+        return CType(fc, esriGeoDatabase.ITable)
+    gdb, name = os.path.split(fc)
+    pFWS = CType(OpenWorkspace(gdb), esriGeoDatabase.IFeatureWorkspace)
+    return pFWS.OpenTable(name)
+
+def AlterSchema(fc, changes, stop_on_error=False, domains=None):
+    """Applies many schema changes to a table under one exclusive schema lock
+
+    The table is opened once and its schema lock is changed to exclusive once
+    for the whole list, then set back to shared.  Changes are applied in order
+    through IClassSchemaEdit4 (a dictionary is applied in SCHEMA_CHANGES
+    order), so a change after a rename must use the new field name.
 
     Required:
-    fc -- feature class (must be in gdb)
-    f_dict -- fields dictionary {field_alias : new_alias, ...}
+    fc -- table or feature class pointer, or full path
+    changes -- list of (kind, field, value) tuples or a dictionary of
+        {kind: {field: value}}, where kind is
+            alias -- new field alias
+            name -- new field name
+            default -- new default value
+            domain -- name of a workspace domain, or None to remove the domain
+
+    Optional:
+    stop_on_error -- stop at the first failed change.  Default is False
+    domains -- dictionary used to cache domains by name, see AlterSchemas()
+
+    returns a SchemaEditResult
+
+    # example usage:
+    res = AlterSchema(r'C:\TEMP\parcels.gdb\parcels', {'alias': {'ACRES': 'Deeded Acres'},
+                                                         'domain': {'ZONING': 'ZoningCodes'}})
+    for change, error in res.failed:
+        print change.field, error
     """
-    getModule('esriGeoDatabase.olb')
-    getModule('esriDataSourcesGDB.olb')
     import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    changes = _schemaChanges(changes)
+    name = fc if isinstance(fc, basestring) else None
+    pTab = _openTable(fc)
+    if pTab is None:
+        raise ValueError('"{}" does not exist!'.format(fc))
+    if name is None:
+        name = CType(pTab, esriGeoDatabase.IDataset).Name
+    if domains is None:
+        domains = {}
+    applied, failed = [], []
+
+    pSL = CType(pTab, esriGeoDatabase.ISchemaLock)
+    pSL.ChangeSchemaLock(esriGeoDatabase.esriExclusiveSchemaLock)
+    try:
+        pSE = CType(pTab, esriGeoDatabase.IClassSchemaEdit4)
+        for change in changes:
+            try:
+                if change.kind == 'alias':
+                    pSE.AlterFieldAliasName(change.field, change.value)
+                elif change.kind == 'name':
+                    pSE.AlterFieldName(change.field, change.value)
+                elif change.kind == 'default':
+                    pSE.AlterDefaultValue(change.field, change.value)
+                else:
+                    pDomain = None
+                    if change.value is not None:
+                        if change.value not in domains:
+                            pWSD = CType(CType(pTab, esriGeoDatabase.IDataset).Workspace,
+                                         esriGeoDatabase.IWorkspaceDomains)
+                            domains[change.value] = pWSD.DomainByName(change.value)
+                        pDomain = domains[change.value]
+                        if pDomain is None:
+                            raise ValueError('"{}" is not a valid domain!'.format(change.value))
+                    pSE.AlterDomain(change.field, pDomain)
+                applied.append(change)
+            except Exception as e:
+                failed.append((change, '{}: {}'.format(e.__class__.__name__, e)))
+                if stop_on_error:
+                    break
+    finally:
+        pSL.ChangeSchemaLock(esriGeoDatabase.esriSharedSchemaLock)
+        ClearSchemaCache(pTab)
+    return SchemaEditResult(name, applied, failed)
+
+def AlterSchemas(gdb, changes, stop_on_error=False):
+    """Applies schema changes to many tables in one workspace, see AlterSchema()
+
+    The workspace is opened once and domains are looked up once for all
+    tables.  A table that can not be opened or locked is reported with every
+    one of its changes failed instead of stopping the others.
 
-    # get at fc properties
-    pFC = OpenFeatureClass(*os.path.split(fc))
+    Required:
+    gdb -- path to geodatabase (or .sde connection file)
+    changes -- dictionary of {table name: changes}
 
-    # get at schema editing library
-    pSE = CType(pFC, esriGeoDatabase.IClassSchemaEdit)
+    Optional:
+    stop_on_error -- stop a table's changes at its first failure.  Default is False
 
-    # iterate through dict and update aliases
-    for field, alias in f_dict.iteritems():
+    returns a dictionary of {table name: SchemaEditResult}
+    """
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    pFWS = CType(OpenWorkspace(gdb), esriGeoDatabase.IFeatureWorkspace)
+    domains = {}
+    results = {}
+    for name, tableChanges in changes.iteritems():
+        tableChanges = _schemaChanges(tableChanges)
         try:
-            pSE.AlterFieldAliasName(field, alias)
-            print 'Changed field "{0}"\'s alias to: "{1}"'.format(field, alias)
-        except:
-            print 'Error changing field "{0}"\'s alias to: "{1}"'.format(field, alias)
-    return
+            pTab = pFWS.OpenTable(name)
+            results[name] = AlterSchema(pTab, tableChanges, stop_on_error, domains)._replace(table=name)
+        except Exception as e:
+            error = '{}: {}'.format(e.__class__.__name__, e)
+            results[name] = SchemaEditResult(name, [], [(c, error) for c in tableChanges])
+    return results
 
-def alter_fieldName(fc, f_dict):
-    """Change field names at the database level
+def alter_alias(fc, f_dict):
+    """Change field aliases at the database level, see AlterSchema()
 
     Required:
     fc -- feature class (must be in gdb)
-    f_dict -- fields dictionary {field_name : new_name, ...}
+    f_dict -- fields dictionary {field_name : new_alias, ...}
     """
-    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
-
-    # get at fc properties
-    pFC = OpenFeatureClass(*os.path.split(fc))
+    res = AlterSchema(fc, {'alias': f_dict})
+    for change, error in res.failed:
+        print 'Error changing field "{0}"\'s alias to: "{1}"'.format(change.field, change.value)
+    return res
 
-    # get at schema editing library
-    pSE = CType(pFC, esriGeoDatabase.IClassSchemaEdit4)
+def alter_fieldName(fc, f_dict):
+    """Change field names at the database level, see AlterSchema()
 
-    # iterate through dict and update aliases
-    for field, new_name in f_dict.iteritems():
-        try:
-            pSE.AlterFieldName(field, new_name)
-            print 'Changed field "{0}" name to: "{1}"'.format(field, new_name)
-        except:
-            print 'Error changing field "{0}" name to: "{1}"'.format(field, new_name)
-    return
+    Required:
+    fc -- feature class (must be in gdb)
+    f_dict -- fields dictionary {field_name : new_name, ...}
+    """
+    res = AlterSchema(fc, {'name': f_dict})
+    for change, error in res.failed:
+        print 'Error changing field "{0}" name to: "{1}"'.format(change.field, change.value)
+    return res
 
 
 if __name__ == '__main__':
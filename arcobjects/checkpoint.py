@@ -0,0 +1,195 @@
+import arcobjects
+import json
+import os
+import time
+
+class ScanState(object):
+    """Small JSON state file for a resumable scan
+
+    Records the last OID and the number of chunks and rows a consumer has
+    finished with, plus the scan function and query (table, fields, chunk
+    size, where clause and spatial filter) it belongs to so a state file is
+    never used to resume a different scan.  The file is replaced through a
+    temporary file, so a crash while saving leaves the previous state.
+
+    Required:
+    path -- path to the state file, it is created if it does not exist
+    """
+    def __init__(self, path):
+        self.path = path
+        self.last_oid = None
+        self.chunks = 0
+        self.rows = 0
+        self.done = False
+        self.query = None
+        self.updated = None
+        tmp = path + '.tmp'
+        if not os.path.exists(path) and os.path.exists(tmp):
+            # crashed between removing the old state and renaming the new one
+            os.rename(tmp, path)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                state = json.load(f)
+            for key, value in state.iteritems():
+                setattr(self, key, value)
+
+    def check(self, query):
+        """raises a ValueError if the state was saved for a different query"""
+        if self.query is None:
+            self.query = query
+        elif self.query != query:
+            raise ValueError('"{}" was written for a different scan: {}'.format(self.path, self.query))
+
+    def save(self):
+        """writes the state file"""
+        self.updated = time.time()
+        state = dict((k, getattr(self, k)) for k in
+                     ('last_oid', 'chunks', 'rows', 'done', 'query', 'updated'))
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+
+    def Clear(self):
+        """removes the state file so the next scan starts from the beginning"""
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+        self.__init__(self.path)
+
+def _query(scan, fc, fields, chunk_size, where, spatial_filter):
+    """returns what a state file must match to resume a scan, as it reads back
+    from JSON (tuples become lists)"""
+    from arcobjects.query_cache import _filterKey
+    workspace, name = arcobjects._datasetKey(fc)[0]
+    query = {'scan': scan, 'table': [workspace, name], 'fields': list(fields) if fields else None,
+             'chunk_size': chunk_size, 'where': where, 'spatial_filter': _filterKey(spatial_filter)}
+    return json.loads(json.dumps(query))
+
+class _Progress(object):
+    """saves a ScanState every interval chunks and when a scan stops"""
+    def __init__(self, state, interval):
+        self.state, self.interval = state, max(int(interval), 1)
+        self.pending = 0
+
+    def finished(self, last_oid, rows):
+        """records a chunk the consumer is done with"""
+        state = self.state
+        state.last_oid, state.chunks, state.rows = last_oid, state.chunks + 1, state.rows + rows
+        self.pending += 1
+        if self.pending >= self.interval:
+            self.flush()
+
+    def flush(self, done=False):
+        if self.pending or done:
+            self.state.done = done
+            self.state.save()
+            self.pending = 0
+
+def CheckpointedSearchCursor(fc, fields, state_file, chunk_size=10000, interval=1,
+                             null_value=None, where=None, spatial_filter=None):
+    """ChunkedSearchCursor that can resume where a failed scan stopped
+
+    Features are read in OID order.  A chunk counts as finished once the
+    consumer asks for the next one, and the last OID, chunk count and row
+    count of the finished chunks are written to state_file every interval
+    chunks, when the scan ends and when the loop is left early.  Running the
+    same scan again with the same state_file starts after the last recorded
+    OID (OBJECTID > n ... ORDER BY OBJECTID) and continues the chunk numbers.
+
+    Chunks after the last save are read again on restart with the same
+    numbers and the same rows (if the data did not change), so a sink that
+    writes each chunk by its number (replacing an earlier write of the same
+    chunk) sees every chunk exactly once.  A finished scan yields nothing
+    until ScanState(state_file).Clear() is called.
+
+    Required:
+    fc -- IFeatureClass pointer with an OID field
+    fields -- list of field names
+    state_file -- path to the JSON state file
+
+    Optional:
+    chunk_size -- rows per chunk, must not change between runs.  Default is 10000
+    interval -- chunks between saves of the state file.  Default is 1
+    null_value, where, spatial_filter -- see ChunkedSearchCursor()
+
+    yields (chunk number, numpy structured array), chunk numbers start at 0
+
+    # example usage:
+    for i, chunk in CheckpointedSearchCursor(fc, ['OBJECTID', 'ACRES'], r'C:\\TEMP\\acres.state'):
+        numpy.save(r'C:\\TEMP\\acres_{}.npy'.format(i), chunk)
+    """
+    if not fc.HasOID:
+        raise ValueError('CheckpointedSearchCursor requires a feature class with an OID field!')
+    state = ScanState(state_file)
+    state.check(_query('CheckpointedSearchCursor', fc, fields, chunk_size, where, spatial_filter))
+    if state.done:
+        return
+    progress = _Progress(state, interval)
+    reader = arcobjects.ChunkReader(fc, fields, null_value)
+    cur = fc.Search(arcobjects._oidFilter(fc, state.last_oid, where=where, fields=fields,
+                                          spatial_filter=spatial_filter), True)
+    try:
+        while True:
+            oids = []
+            chunk = reader.read(cur, chunk_size, oids)
+            if len(chunk):
+                yield state.chunks, chunk
+                progress.finished(oids[-1], len(chunk))
+            if len(chunk) < chunk_size:
+                break
+        progress.flush(done=True)
+    finally:
+        progress.flush()
+
+def CheckpointedFeatures(fc, state_file, chunk_size=1000, interval=1, where=None,
+                         fields=None, spatial_filter=None, recycle=True):
+    """iterFeatures() that can resume where a failed scan stopped
+
+    Features are counted off in chunks of chunk_size, see
+    CheckpointedSearchCursor() for how the state is saved and resumed.  A
+    feature counts as processed once the consumer asks for the next one.
+
+    Required:
+    fc -- IFeatureClass pointer with an OID field
+    state_file -- path to the JSON state file
+
+    Optional:
+    chunk_size -- features per chunk, must not change between runs.  Default is 1000
+    interval -- chunks between saves of the state file.  Default is 1
+    where, fields, spatial_filter, recycle -- see iterFeatures()
+
+    # example usage:
+    for ft in CheckpointedFeatures(fc, r'C:\\TEMP\\scan.state'):
+        print ft.OID
+    """
+    if not fc.HasOID:
+        raise ValueError('CheckpointedFeatures requires a feature class with an OID field!')
+    state = ScanState(state_file)
+    state.check(_query('CheckpointedFeatures', fc, fields, chunk_size, where, spatial_filter))
+    if state.done:
+        return
+    progress = _Progress(state, interval)
+    cur = fc.Search(arcobjects._oidFilter(fc, state.last_oid, where=where, fields=fields,
+                                          spatial_filter=spatial_filter), recycle)
+    rows = 0
+    try:
+        ft = cur.NextFeature()
+        while ft:
+            # the feature may be recycled, so read its OID before yielding it
+            oid = ft.OID
+            yield ft
+            rows += 1
+            if rows == chunk_size:
+                progress.finished(oid, rows)
+                rows = 0
+            ft = cur.NextFeature()
+        if rows:
+            progress.finished(oid, rows)
+        progress.flush(done=True)
+    finally:
+        progress.flush()
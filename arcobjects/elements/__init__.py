@@ -1,3 +1,4 @@
 from line_elements import *
 from text_elements import *
-
+from element_batch import *
+from table_elements import *
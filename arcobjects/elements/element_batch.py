@@ -0,0 +1,135 @@
+import arcobjects
+import comtypes.gen.esriFramework as esriFramework
+import comtypes.gen.esriArcMapUI as esriArcMapUI
+import comtypes.gen.esriGeometry as esriGeometry
+import comtypes.gen.esriCarto as esriCarto
+from line_elements import make_line_symbol, make_line_element
+from text_elements import make_text_symbol, make_text_element
+
+class ElementBatch(object):
+    '''Builds many text and line elements and adds them to an mxd at once
+
+    Elements with the same style share one symbol object (a copy from
+    arcobjects.SYMBOL_CACHE), all elements are added with a single
+    IGraphicsContainer.AddElements call and the view is refreshed once over
+    the combined envelope of the new elements when the batch is committed.
+    Elements are not selected like add_text()/add_line() do, since selecting
+    thousands of elements is slow.
+
+    Optional:
+    pApp -- mxd application reference, if none specified
+            will use current open map document
+    view -- choose view for the elements (layout|data)
+
+    # example usage:
+    with ElementBatch(view='layout') as batch:
+        for i in range(20):
+            batch.add_text('Row {}'.format(i), 'row{}'.format(i), x=1, y=10 - i * 0.25)
+            batch.add_line('rowLine{}'.format(i), x=1, y=10 - i * 0.25, x_len=4)
+    '''
+    def __init__(self, pApp=None, view='layout'):
+        if not pApp:
+            pApp = arcobjects.GetApp()
+        if str(pApp).lower() == 'current':
+            pApp = arcobjects.GetCurrentApp()
+        self.pFact = arcobjects.CType(pApp, esriFramework.IObjectFactory)
+        pMxDoc = arcobjects.CType(pApp.Document, esriArcMapUI.IMxDocument)
+        self.pMapL = pMxDoc.FocusMap
+        if view.lower() == 'layout':
+            self.pMapL = pMxDoc.PageLayout
+        self.pAV = arcobjects.CType(self.pMapL, esriCarto.IActiveView)
+        self.view = view
+        self.elements = []
+        self._symbols = {}
+
+    def _symbol(self, key, factory, *args):
+        '''returns the shared symbol for a style, creating it on first use'''
+        if key not in self._symbols:
+            self._symbols[key] = factory(self.pFact, *args)
+        return self._symbols[key]
+
+    def add_text(self, text='Hello, World!', name='textElm', size=10, font='Arial',
+                 bold=False, rgb=(0,0,0), x=None, y=None, wrapping=None, angle=0,
+                 anchor=0, mask=False, mask_size=1):
+        '''queues a text element, see add_text() for the arguments'''
+        style = ('text', size, font, bool(bold), tuple(rgb), angle, bool(mask), mask_size)
+        pTextSymbol = self._symbol(style, make_text_symbol, size, font, bold, rgb,
+                                   angle, mask, mask_size)
+        pElement = make_text_element(self.pFact, self.pAV, pTextSymbol, text, name, x, y,
+                                     wrapping, anchor, self.view)
+        self.elements.append(pElement)
+        return pElement
+
+    def add_line(self, name='Line', x=None, y=None, end_x=None, end_y=None,
+                 x_len=0, y_len=0, anchor=0, rgb=(0,0,0), width=1):
+        '''queues a line element, see add_line() for the arguments'''
+        pLineSymbol = self._symbol(('line', tuple(rgb), width), make_line_symbol, rgb, width)
+        pElement = make_line_element(self.pFact, self.pAV, pLineSymbol, name, x, y,
+                                     end_x, end_y, x_len, y_len, anchor, self.view)
+        self.elements.append(pElement)
+        return pElement
+
+    def add(self, spec):
+        '''queues an element from a dictionary of add_text() or add_line()
+        arguments, the "type" key is "text" or "line"'''
+        spec = dict(spec)
+        kind = spec.pop('type', 'text').lower()
+        if kind == 'text':
+            return self.add_text(**spec)
+        if kind == 'line':
+            return self.add_line(**spec)
+        raise ValueError('"{}" is not a valid element type!'.format(kind))
+
+    def _bounds(self, elements):
+        '''returns the union envelope of elements'''
+        pSD = self.pAV.ScreenDisplay
+        # one scratch envelope is reused for every element's bounds
+        pEnvAll, pEnv = [arcobjects.CType(self.pFact.Create(arcobjects.CLSID(esriGeometry.Envelope)),
+                                          esriGeometry.IEnvelope) for i in range(2)]
+        for i, pElement in enumerate(elements):
+            pElement.QueryBounds(pSD, pEnvAll if i == 0 else pEnv)
+            if i:
+                pEnvAll.Union(pEnv)
+        return pEnvAll
+
+    def commit(self):
+        '''adds the queued elements to the map and refreshes the view once,
+        returns the list of added IElement pointers'''
+        elements, self.elements = self.elements, []
+        if not elements:
+            return elements
+        pUnk = self.pFact.Create(arcobjects.CLSID(esriCarto.ElementCollection))
+        pElmColl = arcobjects.CType(pUnk, esriCarto.IElementCollection)
+        for pElement in elements:
+            pElmColl.Add(pElement, 0)
+        pGC = arcobjects.CType(self.pMapL, esriCarto.IGraphicsContainer)
+        pGC.AddElements(pElmColl, 0)
+
+        arcobjects.REFRESH.Invalidate(self.pAV, esriCarto.esriViewGraphics, self._bounds(elements))
+        return elements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.commit()
+
+def add_elements(specs, pApp=None, view='layout'):
+    '''Adds many text and line elements to an mxd with one refresh
+
+    Required:
+    specs -- list of dictionaries of add_text() or add_line() arguments, with
+             "type" set to "text" (default) or "line"
+
+    Optional:
+    pApp -- mxd application reference, if none specified
+            will use current open map document
+    view -- choose view for the elements (layout|data)
+
+    returns the list of added IElement pointers
+    '''
+    batch = ElementBatch(pApp, view)
+    for spec in specs:
+        batch.add(spec)
+    return batch.commit()
@@ -7,53 +7,44 @@ import comtypes.gen.esriCarto as esriCarto
 import comtypes.gen.esriDisplay as esriDisplay
 import comtypes.gen.stdole as stdole
 
-def add_line(pApp=None, name='Line', x=None, y=None, end_x=None, end_y=None,
-             x_len=0, y_len=0, anchor=0, rgb=(0,0,0), view='layout'):
-    '''adds a line to an ArcMap Document
+def _create_line_symbol(pFact, rgb, width):
+    '''creates a new ISimpleLineSymbol, use make_line_symbol() for a cached copy'''
+    # preset color according to RGB values
+    pUnk_color = pFact.Create(arcobjects.CLSID(esriDisplay.RgbColor))
+    pColor = arcobjects.CType(pUnk_color, esriDisplay.IRgbColor)
+    pColor.Red, pColor.Green, pColor.Blue = rgb
+
+    # set line properties
+    pUnk_line = pFact.Create(arcobjects.CLSID(esriDisplay.SimpleLineSymbol))
+    pLineSymbol = arcobjects.CType(pUnk_line, esriDisplay.ISimpleLineSymbol)
+    pLineSymbol.Color = pColor
+    pLineSymbol.Width = width
+    return pLineSymbol
+
+def make_line_symbol(pFact, rgb=(0,0,0), width=1):
+    '''returns an ISimpleLineSymbol from arcobjects.SYMBOL_CACHE
 
     Required:
-    pApp -- reference to either open ArcMap document or path on disk
-    name -- name of line element
+    pFact -- IObjectFactory for the application
 
     Optional:
-    x -- start x coordinate, if none, middle of the extent will be used (data view)
-    y -- start y coordinate, if none, middle of the extent will be used (data view)
-    end_x -- end x coordinate, if making straight lines use x_len
-    end_y -- end y coordinate, if making straight lines use y_len
-    x_len -- length of line in east/west direction
-    y_len -- length of line in north/south direction
-    anchor -- anchor point for line element
     rgb -- tuple for red, green, blue color values.  Default is (0,0,0) for black.
-    view -- choose view for text element (layout|data)
-
-    Anchor Points:
-        esriTopLeftCorner 	0 	Anchor to the top left corner.
-        esriTopMidPoint 	1 	Anchor to the top mid point.
-        esriTopRightCorner 	2 	Anchor to the top right corner.
-        esriLeftMidPoint 	3 	Anchor to the left mid point.
-        esriCenterPoint 	4 	Anchor to the center point.
-        esriRightMidPoint 	5 	Anchor to the right mid point.
-        esriBottomLeftCorner 	6 	Anchor to the bottom left corner.
-        esriBottomMidPoint 	7 	Anchor to the bottom mid point.
-        esriBottomRightCorner 	8 	Anchor to the botton right corner.
+    width -- line width in points.  Default is 1
     '''
+    return arcobjects.SYMBOL_CACHE.Get(('line', tuple(rgb), width),
+                                       lambda: _create_line_symbol(pFact, rgb, width),
+                                       esriDisplay.ISimpleLineSymbol)
 
-    # set mxd
-    if not pApp:
-        pApp = arcobjects.GetApp()
-    if str(pApp).lower() == 'current':
-        pApp = arcobjects.GetCurrentApp()
-    pDoc = pApp.Document
-    pMxDoc = arcobjects.CType(pDoc, esriArcMapUI.IMxDocument)
-    pMap = pMxDoc.FocusMap
-    pMapL = pMap
-    if view.lower() == 'layout':
-        pMapL = pMxDoc.PageLayout
-    pAV = arcobjects.CType(pMapL, esriCarto.IActiveView)
-    pSD = pAV.ScreenDisplay
+def make_line_element(pFact, pAV, pLineSymbol, name='Line', x=None, y=None, end_x=None,
+                      end_y=None, x_len=0, y_len=0, anchor=0, view='layout'):
+    '''creates a line element without adding it to the map, see add_line()
 
+    Required:
+    pFact -- IObjectFactory for the application
+    pAV -- IActiveView the element is for
+    pLineSymbol -- ILineSymbol for the element
+    '''
     # set coords for elment
-    pFact = arcobjects.CType(pApp, esriFramework.IObjectFactory)
     if view.lower() == 'data':
         pEnv = pAV.Extent
         if x == None:
@@ -84,16 +75,6 @@ def add_line(pApp=None, name='Line', x=None, y=None, end_x=None, end_y=None,
     pLg.FromPoint = pPt
     pLg.ToPoint = pPt2
 
-    # preset color according to RGB values
-    pUnk_color = pFact.Create(arcobjects.CLSID(esriDisplay.RgbColor))
-    pColor = arcobjects.CType(pUnk_color, esriDisplay.IRgbColor)
-    pColor.Red, pColor.Green, pColor.Blue = rgb
-
-    # set line properties
-    pUnk_line = pFact.Create(arcobjects.CLSID(esriDisplay.SimpleLineSymbol))
-    pLineSymbol = arcobjects.CType(pUnk_line, esriDisplay.ISimpleLineSymbol)
-    pLineSymbol.Color = pColor
-
     # create the actual element
     pUnk_elm = pFact.Create(arcobjects.CLSID(esriCarto.LineElement))
     pLineElement = arcobjects.CType(pUnk_elm, esriCarto.ILineElement)
@@ -105,6 +86,58 @@ def add_line(pApp=None, name='Line', x=None, y=None, end_x=None, end_y=None,
     pElmProp.Name = name
     pElmProp.AnchorPoint = esriCarto.esriAnchorPointEnum(anchor)
     pElement.Geometry = pLg
+    return pElement
+
+def add_line(pApp=None, name='Line', x=None, y=None, end_x=None, end_y=None,
+             x_len=0, y_len=0, anchor=0, rgb=(0,0,0), view='layout', width=1):
+    '''adds a line to an ArcMap Document
+
+    Required:
+    pApp -- reference to either open ArcMap document or path on disk
+    name -- name of line element
+
+    Optional:
+    x -- start x coordinate, if none, middle of the extent will be used (data view)
+    y -- start y coordinate, if none, middle of the extent will be used (data view)
+    end_x -- end x coordinate, if making straight lines use x_len
+    end_y -- end y coordinate, if making straight lines use y_len
+    x_len -- length of line in east/west direction
+    y_len -- length of line in north/south direction
+    anchor -- anchor point for line element
+    rgb -- tuple for red, green, blue color values.  Default is (0,0,0) for black.
+    view -- choose view for text element (layout|data)
+    width -- line width in points.  Default is 1
+
+    Anchor Points:
+        esriTopLeftCorner 	0 	Anchor to the top left corner.
+        esriTopMidPoint 	1 	Anchor to the top mid point.
+        esriTopRightCorner 	2 	Anchor to the top right corner.
+        esriLeftMidPoint 	3 	Anchor to the left mid point.
+        esriCenterPoint 	4 	Anchor to the center point.
+        esriRightMidPoint 	5 	Anchor to the right mid point.
+        esriBottomLeftCorner 	6 	Anchor to the bottom left corner.
+        esriBottomMidPoint 	7 	Anchor to the bottom mid point.
+        esriBottomRightCorner 	8 	Anchor to the botton right corner.
+    '''
+
+    # set mxd
+    if not pApp:
+        pApp = arcobjects.GetApp()
+    if str(pApp).lower() == 'current':
+        pApp = arcobjects.GetCurrentApp()
+    pDoc = pApp.Document
+    pMxDoc = arcobjects.CType(pDoc, esriArcMapUI.IMxDocument)
+    pMap = pMxDoc.FocusMap
+    pMapL = pMap
+    if view.lower() == 'layout':
+        pMapL = pMxDoc.PageLayout
+    pAV = arcobjects.CType(pMapL, esriCarto.IActiveView)
+    pSD = pAV.ScreenDisplay
+    pFact = arcobjects.CType(pApp, esriFramework.IObjectFactory)
+
+    pLineSymbol = make_line_symbol(pFact, rgb, width)
+    pElement = make_line_element(pFact, pAV, pLineSymbol, name, x, y, end_x, end_y,
+                                 x_len, y_len, anchor, view)
 
     # add to map
     pGC = arcobjects.CType(pMapL, esriCarto.IGraphicsContainer)
@@ -113,7 +146,7 @@ def add_line(pApp=None, name='Line', x=None, y=None, end_x=None, end_y=None,
     pGCSel.SelectElement(pElement)
     iOpt = esriCarto.esriViewGraphics + \
            esriCarto.esriViewGraphicSelection
-    pAV.PartialRefresh(iOpt, None, None)
+    arcobjects.REFRESH.Invalidate(pAV, iOpt)
     return pElement
 
 if __name__ == '__main__':
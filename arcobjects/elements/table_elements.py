@@ -0,0 +1,216 @@
+import arcobjects
+import comtypes.gen.esriFramework as esriFramework
+import comtypes.gen.esriArcMapUI as esriArcMapUI
+import comtypes.gen.esriGeometry as esriGeometry
+import comtypes.gen.esriCarto as esriCarto
+import comtypes.gen.esriDisplay as esriDisplay
+from line_elements import make_line_symbol, make_line_element
+from text_elements import make_text_symbol, make_text_element
+
+class TextMeasure(object):
+    '''Caches text widths by font style
+
+    Each character is measured once per style with ITextSymbol.GetTextSize and
+    strings are measured by adding up their character widths, so laying out a
+    table takes one call per distinct character instead of one per cell.
+    Kerning is ignored, which only makes columns slightly wider.
+    '''
+    def __init__(self):
+        self._chars = {}
+        self._heights = {}
+
+    def _measure(self, pTextSymbol, pSD, text):
+        xSize, ySize = pTextSymbol.GetTextSize(pSD.hDC, pSD.DisplayTransformation, text)
+        return xSize, ySize
+
+    def width(self, pTextSymbol, style, text, pSD):
+        '''returns the width of text in points
+
+        Required:
+        pTextSymbol -- ITextSymbol the text is drawn with
+        style -- hashable style tuple identifying pTextSymbol's font
+        text -- string to measure
+        pSD -- IScreenDisplay to measure on
+        '''
+        chars = self._chars.setdefault(style, {})
+        total = 0.0
+        for c in text:
+            if c not in chars:
+                chars[c] = self._measure(pTextSymbol, pSD, c)[0]
+            total += chars[c]
+        return total
+
+    def height(self, pTextSymbol, style, pSD):
+        '''returns the line height in points for a style'''
+        if style not in self._heights:
+            self._heights[style] = self._measure(pTextSymbol, pSD, 'Xg')[1]
+        return self._heights[style]
+
+    def Clear(self):
+        self._chars.clear()
+        self._heights.clear()
+
+TEXT_MEASURE = TextMeasure()
+
+def _cell(value):
+    '''returns the text for a table cell'''
+    if value is None:
+        return ''
+    if isinstance(value, basestring):
+        return value
+    return str(value)
+
+def _table_rows(data, header):
+    '''returns (header, rows) as lists of strings from a list of rows or a numpy array'''
+    if hasattr(data, 'dtype'):
+        if data.dtype.names:
+            if header is None:
+                header = list(data.dtype.names)
+            data = data.tolist()
+        else:
+            data = data.reshape(len(data), -1).tolist()
+    rows = [[_cell(v) for v in row] for row in data]
+    if header is not None:
+        header = [_cell(h) for h in header]
+    return header, rows
+
+def add_table(data, pApp=None, name='tableElm', header=None, x=None, y=None,
+              size=8, font='Arial', rgb=(0,0,0), bold_header=True, padding=2,
+              grid=True, line_rgb=(0,0,0), view='layout'):
+    '''Adds a table of text as one group element to an mxd
+
+    Column widths are taken from the widest cell in each column, measured
+    through TEXT_MEASURE.  All cells and grid lines are put in one GroupElement
+    which is added to the map with a single refresh.
+
+    Required:
+    data -- list of rows (sequences of values) or a numpy array.  The field
+            names of a structured array are used as the header.
+
+    Optional:
+    pApp -- mxd application reference, if none specified
+            will use current open map document
+    name -- name of group element, cells are named <name>_<row>_<col>
+    header -- list of column headings
+    x -- x-axis position for top left corner (in map units)
+    y -- y-axis position for top left corner (in map units)
+    size -- font size
+    font -- name of font
+    rgb -- tuple of red, green, blue color values for text. Default is (0,0,0) for black.
+    bold_header -- set header text to bold (bool)
+    padding -- space around text in each cell, in points
+    grid -- draw lines between cells (bool)
+    line_rgb -- tuple of red, green, blue color values for grid lines
+    view -- choose view for table element (layout|data)
+
+    returns the IGroupElement pointer
+
+    # example usage:
+    add_table([('Parcel', 1.25), ('Road', 0.5)], header=['Type', 'Acres'], x=1, y=10)
+    '''
+
+    # get object factory
+    if not pApp:
+        pApp = arcobjects.GetApp()
+    if str(pApp).lower() == 'current':
+        pApp = arcobjects.GetCurrentApp()
+    pFact = arcobjects.CType(pApp, esriFramework.IObjectFactory)
+
+    # set mxd
+    pDoc = pApp.Document
+    pMxDoc = arcobjects.CType(pDoc, esriArcMapUI.IMxDocument)
+    pMapL = pMxDoc.FocusMap
+    if view.lower() == 'layout':
+        pMapL = pMxDoc.PageLayout
+    pAV = arcobjects.CType(pMapL, esriCarto.IActiveView)
+    pSD = pAV.ScreenDisplay
+
+    header, rows = _table_rows(data, header)
+    if header is not None:
+        rows.insert(0, header)
+    if not rows:
+        raise ValueError('table has no rows!')
+    ncols = max(len(row) for row in rows)
+
+    # one symbol per style, measured once per font.  The symbols draw text up
+    # and to the right of the element's point, so cells are placed by their
+    # bottom left corner
+    halign, valign = esriDisplay.esriTHALeft, esriDisplay.esriTVABottom
+    bodyStyle = ('text', tuple(rgb), font, size, False)
+    body = (bodyStyle, make_text_symbol(pFact, size, font, False, rgb, halign=halign, valign=valign))
+    head = body
+    if header is not None and bold_header:
+        headStyle = ('text', tuple(rgb), font, size, True)
+        head = (headStyle, make_text_symbol(pFact, size, font, True, rgb, halign=halign, valign=valign))
+
+    def row_style(r):
+        return head if r == 0 else body
+
+    widths = [0.0] * ncols
+    for r, row in enumerate(rows):
+        style, pTextSymbol = row_style(r)
+        for c, text in enumerate(row):
+            widths[c] = max(widths[c], TEXT_MEASURE.width(pTextSymbol, style, text, pSD))
+    textHeight = max(TEXT_MEASURE.height(pTextSymbol, style, pSD) for style, pTextSymbol in (head, body))
+
+    # convert points to map units
+    pDT = pSD.DisplayTransformation
+    toMap = pDT.FromPoints(1.0)
+    colWidths = [(w + padding * 2) * toMap for w in widths]
+    rowHeight = (textHeight + padding * 2) * toMap
+    pad = padding * toMap
+
+    # top left corner, default is off the page like add_text()
+    if view.lower() == 'data':
+        pEnv = pAV.Extent
+        if x == None:
+            x = pEnv.XMin
+        if y == None:
+            y = pEnv.YMax
+    else:
+        if x == None: x = -4
+        if y == None: y = 4
+
+    pUnk = pFact.Create(arcobjects.CLSID(esriCarto.GroupElement))
+    pGroup = arcobjects.CType(pUnk, esriCarto.IGroupElement)
+
+    # cells, text is drawn from the bottom left corner (see the symbols above)
+    for r, row in enumerate(rows):
+        pTextSymbol = row_style(r)[1]
+        cellY = y - (r + 1) * rowHeight + pad
+        cellX = x
+        for c, text in enumerate(row):
+            if text:
+                pElement = make_text_element(pFact, pAV, pTextSymbol, text,
+                                             '{}_{}_{}'.format(name, r, c),
+                                             cellX + pad, cellY, anchor=6, view=view)
+                pGroup.AddElement(pElement)
+            cellX += colWidths[c]
+
+    # grid lines
+    if grid:
+        pLineSymbol = make_line_symbol(pFact, line_rgb)
+        tableWidth = sum(colWidths)
+        tableHeight = rowHeight * len(rows)
+        for r in range(len(rows) + 1):
+            pGroup.AddElement(make_line_element(pFact, pAV, pLineSymbol, '{}_row{}'.format(name, r),
+                                                x, y - r * rowHeight, x_len=tableWidth, view=view))
+        lineX = x
+        for c in range(ncols + 1):
+            pGroup.AddElement(make_line_element(pFact, pAV, pLineSymbol, '{}_col{}'.format(name, c),
+                                                lineX, y, y_len=-tableHeight, view=view))
+            if c < ncols:
+                lineX += colWidths[c]
+
+    pElement = arcobjects.CType(pGroup, esriCarto.IElement)
+    pElmProp = arcobjects.CType(pElement, esriCarto.IElementProperties3)
+    pElmProp.Name = name
+
+    # add to map and refresh the table's extent once
+    pGC = arcobjects.CType(pMapL, esriCarto.IGraphicsContainer)
+    pGC.AddElement(pElement, 0)
+    pUnk = pFact.Create(arcobjects.CLSID(esriGeometry.Envelope))
+    pEnv = arcobjects.CType(pUnk, esriGeometry.IEnvelope)
+    pElement.QueryBounds(pSD, pEnv)
+    arcobjects.REFRESH.Invalidate(pAV, esriCarto.esriViewGraphics, pEnv)
+    return pGroup
@@ -8,6 +8,98 @@ import comtypes.gen.esriCarto as esriCarto
 import comtypes.gen.esriDisplay as esriDisplay
 import comtypes.gen.stdole as stdole
 
+def _create_text_symbol(pFact, size, font, bold, rgb, angle, mask, mask_size,
+                        halign=None, valign=None):
+    '''creates a new ITextSymbol, use make_text_symbol() for a cached copy'''
+    # preset color according to RGB values
+    pUnk = pFact.Create(arcobjects.CLSID(esriDisplay.RgbColor))
+    pColor = arcobjects.CType(pUnk, esriDisplay.IRgbColor)
+    pColor.Red, pColor.Green, pColor.Blue = rgb
+
+    # set text properties
+    pUnk = pFact.Create(arcobjects.CLSID(stdole.StdFont))
+    pFontDisp = arcobjects.CType(pUnk, stdole.IFontDisp)
+    pFontDisp.Name = font
+    pFontDisp.Bold = bold
+    pUnk = pFact.Create(arcobjects.CLSID(esriDisplay.TextSymbol))
+    pTextSymbol = arcobjects.CType(pUnk, esriDisplay.ITextSymbol)
+    pTextSymbol.Font = pFontDisp
+    pTextSymbol.Color = pColor
+    pTextSymbol.Size = size
+    pTextSymbol.Angle = angle
+    if halign is not None:
+        pTextSymbol.HorizontalAlignment = halign
+    if valign is not None:
+        pTextSymbol.VerticalAlignment = valign
+
+    # create mask
+    if mask:
+        pMask = arcobjects.CType(pTextSymbol, esriDisplay.IMask)
+        pMask.MaskStyle = 1
+        pMask.MaskSize = mask_size
+    return pTextSymbol
+
+def make_text_symbol(pFact, size=10, font='Arial', bold=False, rgb=(0,0,0),
+                     angle=0, mask=False, mask_size=1, halign=None, valign=None):
+    '''returns an ITextSymbol from arcobjects.SYMBOL_CACHE, see add_text() for
+    the style arguments
+
+    Required:
+    pFact -- IObjectFactory for the application
+
+    Optional:
+    halign -- esriTextHorizontalAlignment, where the text is drawn relative
+              to the element's point.  Default is None for the symbol default
+    valign -- esriTextVerticalAlignment.  Default is None for the symbol default
+    '''
+    style = ('text', tuple(rgb), font, size, bool(bold), angle, bool(mask), mask_size,
+             halign, valign)
+    creator = lambda: _create_text_symbol(pFact, size, font, bold, rgb, angle, mask, mask_size,
+                                          halign, valign)
+    return arcobjects.SYMBOL_CACHE.Get(style, creator, esriDisplay.ITextSymbol)
+
+def make_text_element(pFact, pAV, pTextSymbol, text='Hello, World!', name='textElm',
+                      x=None, y=None, wrapping=None, anchor=0, view='layout'):
+    '''creates a text element without adding it to the map, see add_text()
+
+    Required:
+    pFact -- IObjectFactory for the application
+    pAV -- IActiveView the element is for
+    pTextSymbol -- ITextSymbol for the element
+    '''
+    # set coords for text elm
+    pUnk = pFact.Create(arcobjects.CLSID(esriGeometry.Point))
+    pPt = arcobjects.CType(pUnk, esriGeometry.IPoint)
+    if view.lower() == 'data':
+        pEnv = pAV.Extent
+        if not x:
+            x = (pEnv.XMin + pEnv.XMax) / 2
+        if not y:
+            y = (pEnv.YMin + pEnv.YMax) / 2
+    else:
+        # default layout, move off page
+        if x == None: x = -4
+        if y == None: y = 4
+    pPt.PutCoords(x, y)
+
+    # create the actual element
+    pUnk = pFact.Create(arcobjects.CLSID(esriCarto.TextElement))
+    pTextElement = arcobjects.CType(pUnk, esriCarto.ITextElement)
+    pTextElement.Symbol = pTextSymbol
+    pTextElement.ScaleText = False
+    if wrapping:
+        pTextElement.Text = textwrap.fill(text, wrapping)
+    else:
+        pTextElement.Text = text
+    pElement = arcobjects.CType(pTextElement, esriCarto.IElement)
+    pElement.Geometry = pPt
+
+    # elm properties
+    pElmProp = arcobjects.CType(pElement, esriCarto.IElementProperties3)
+    pElmProp.Name = name
+    pElmProp.AnchorPoint = esriCarto.esriAnchorPointEnum(anchor)
+    return pElement
+
 def add_text(pApp=None, text='Hello, World!', name='textElm',
              size=10, font='Arial', bold=False, rgb=(0,0,0),
              x=None, y=None, wrapping=None, angle=0, anchor=0,
@@ -63,60 +155,9 @@ def add_text(pApp=None, text='Hello, World!', name='textElm',
     pAV = arcobjects.CType(pMapL, esriCarto.IActiveView)
     pSD = pAV.ScreenDisplay
 
-    # set coords for text elm
-    pUnk = pFact.Create(arcobjects.CLSID(esriGeometry.Point))
-    pPt = arcobjects.CType(pUnk, esriGeometry.IPoint)
-    if view.lower() == 'data':
-        pEnv = pAV.Extent
-        if not x:
-            x = (pEnv.XMin + pEnv.XMax) / 2
-        if not y:
-            y = (pEnv.YMin + pEnv.YMax) / 2
-    else:
-        # default layout, move off page
-        if x == None: x = -4
-        if y == None: y = 4
-    pPt.PutCoords(x, y)
-
-    # preset color according to RGB values
-    pUnk = pFact.Create(arcobjects.CLSID(esriDisplay.RgbColor))
-    pColor = arcobjects.CType(pUnk, esriDisplay.IRgbColor)
-    pColor.Red, pColor.Green, pColor.Blue = rgb
-
-    # set text properties
-    pUnk = pFact.Create(arcobjects.CLSID(stdole.StdFont))
-    pFontDisp = arcobjects.CType(pUnk, stdole.IFontDisp)
-    pFontDisp.Name = font
-    pFontDisp.Bold = bold
-    pUnk = pFact.Create(arcobjects.CLSID(esriDisplay.TextSymbol))
-    pTextSymbol = arcobjects.CType(pUnk, esriDisplay.ITextSymbol)
-    pTextSymbol.Font = pFontDisp
-    pTextSymbol.Color = pColor
-    pTextSymbol.Size = size
-    pTextSymbol.Angle = angle
-
-    # create mask
-    if mask:
-        pMask = arcobjects.CType(pTextSymbol, esriDisplay.IMask)
-        pMask.MaskStyle = 1
-        pMask.MaskSize = mask_size
-
-    # create the actual element
-    pUnk = pFact.Create(arcobjects.CLSID(esriCarto.TextElement))
-    pTextElement = arcobjects.CType(pUnk, esriCarto.ITextElement)
-    pTextElement.Symbol = pTextSymbol
-    pTextElement.ScaleText = False
-    if wrapping:
-        pTextElement.Text = textwrap.fill(text, wrapping)
-    else:
-        pTextElement.Text = text
-    pElement = arcobjects.CType(pTextElement, esriCarto.IElement)
-    pElement.Geometry = pPt
-
-    # elm properties
-    pElmProp = arcobjects.CType(pElement, esriCarto.IElementProperties3)
-    pElmProp.Name = name
-    pElmProp.AnchorPoint = esriCarto.esriAnchorPointEnum(anchor)
+    pTextSymbol = make_text_symbol(pFact, size, font, bold, rgb, angle, mask, mask_size)
+    pElement = make_text_element(pFact, pAV, pTextSymbol, text, name, x, y,
+                                 wrapping, anchor, view)
 
     # add to map
     pGC = arcobjects.CType(pMapL, esriCarto.IGraphicsContainer)
@@ -125,7 +166,7 @@ def add_text(pApp=None, text='Hello, World!', name='textElm',
     pGCSel.SelectElement(pElement)
     iOpt = esriCarto.esriViewGraphics + \
            esriCarto.esriViewGraphicSelection
-    pAV.PartialRefresh(iOpt, None, None)
+    arcobjects.REFRESH.Invalidate(pAV, iOpt)
     return pElement
 
 if __name__ == '__main__':
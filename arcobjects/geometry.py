@@ -0,0 +1,231 @@
+import arcobjects
+import collections
+import ctypes
+
+# esriGeometryType codes
+GEOMETRY_POINT = 1
+GEOMETRY_MULTIPOINT = 2
+GEOMETRY_POLYLINE = 3
+GEOMETRY_POLYGON = 4
+
+# Coordinates are an (n, 2) float64 array of x, y.  Paths and rings index into
+# coords through ring_offsets, parts (a polygon's exterior ring plus its interior
+# rings, or a single path) index into rings through part_offsets, and each shape
+# indexes into parts through geom_offsets.  All offset arrays have one more
+# element than the number of items they describe.
+GeometryArrays = collections.namedtuple('GeometryArrays',
+                                        'coords ring_offsets part_offsets geom_offsets geometry_type')
+
+def _wksPointer(buf, start):
+    """returns a WKSPoint pointer into a float64 (n, 2) array at row start"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    return ctypes.cast(buf.ctypes.data + start * buf.strides[0],
+                       ctypes.POINTER(esriGeometry.WKSPoint))
+
+def _pointCount(shape):
+    """returns the number of vertices in a shape"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    if shape is None or shape.IsEmpty:
+        return 0
+    if shape.GeometryType == GEOMETRY_POINT:
+        return 1
+    return arcobjects.CType(shape, esriGeometry.IPointCollection4).PointCount
+
+def _queryShape(shape, coords, start, rings, parts):
+    """copies the vertices of shape into coords at row start and appends the
+    starting vertex of each ring and starting ring of each part"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    count = _pointCount(shape)
+    if not count:
+        return 0
+    geomType = shape.GeometryType
+    if geomType == GEOMETRY_POINT:
+        pPt = arcobjects.CType(shape, esriGeometry.IPoint)
+        coords[start] = (pPt.X, pPt.Y)
+        parts.append(len(rings))
+        rings.append(start)
+        return 1
+
+    # one call copies every vertex of every part
+    pPC4 = arcobjects.CType(shape, esriGeometry.IPointCollection4)
+    pPC4._IPointCollection4__com_QueryWKSPoints(0, count, _wksPointer(coords, start))
+
+    if geomType == GEOMETRY_MULTIPOINT:
+        parts.append(len(rings))
+        rings.append(start)
+        return count
+
+    pGC = arcobjects.CType(shape, esriGeometry.IGeometryCollection)
+    offset = start
+    for i in range(pGC.GeometryCount):
+        part = pGC.Geometry(i)
+        if geomType != GEOMETRY_POLYGON or arcobjects.CType(part, esriGeometry.IRing).IsExterior:
+            parts.append(len(rings))
+        rings.append(offset)
+        offset += arcobjects.CType(part, esriGeometry.IPointCollection).PointCount
+    return count
+
+def ShapesToNumPy(shapes):
+    """Copies the vertices of a sequence of shapes into numpy arrays
+
+    Vertices are copied with IPointCollection4.QueryWKSPoints, one call per
+    shape, straight into a float64 buffer.  Null or empty shapes have no parts.
+
+    Required:
+    shapes -- sequence of IGeometry pointers (such as the shape column from a
+        ChunkedSearchCursor array) of one geometry type
+
+    returns a GeometryArrays tuple
+    """
+    import numpy
+    shapes = list(shapes)
+    counts = [_pointCount(s) for s in shapes]
+    coords = numpy.empty((sum(counts), 2), numpy.float64)
+    rings, parts, geoms = [], [], []
+    geomType = None
+    start = 0
+    for shape, count in zip(shapes, counts):
+        geoms.append(len(parts))
+        if count:
+            if geomType is None:
+                geomType = shape.GeometryType
+            elif shape.GeometryType != geomType:
+                raise ValueError('All shapes must be the same geometry type!')
+            start += _queryShape(shape, coords, start, rings, parts)
+    geoms.append(len(parts))
+    parts.append(len(rings))
+    rings.append(start)
+    return GeometryArrays(coords,
+                          numpy.array(rings, numpy.int32),
+                          numpy.array(parts, numpy.int32),
+                          numpy.array(geoms, numpy.int32),
+                          geomType)
+
+def ShapeToNumPy(shape):
+    """Copies the vertices of a single shape into numpy arrays, see ShapesToNumPy()"""
+    return ShapesToNumPy([shape])
+
+def ChunkedShapeCursor(fc, fields=[], chunk_size=10000, null_value=None,
+                       where=None, spatial_filter=None, postfix=None):
+    """ChunkedSearchCursor that also returns the shapes as coordinate arrays
+
+    Required:
+    fc -- IFeatureClass pointer
+
+    Optional:
+    fields -- list of attribute fields to return with the shapes
+    chunk_size, null_value, where, spatial_filter, postfix -- see
+        arcobjects.ChunkedSearchCursor()
+
+    yields (attribute array, GeometryArrays) for each chunk
+
+    # example usage:
+    for attrs, geom in ChunkedShapeCursor(fc, ['OBJECTID']):
+        print attrs['OBJECTID'][0], geom.coords[:, 0].max()
+    """
+    shapeField = fc.ShapeFieldName
+    fields = [f for f in fields if f.lower() != shapeField.lower()]
+    for chunk in arcobjects.ChunkedSearchCursor(fc, fields + [shapeField], chunk_size,
+                                                null_value, where, spatial_filter, postfix):
+        geom = ShapesToNumPy(chunk[str(shapeField)])
+        attrs = chunk[[str(f) for f in fields]].copy() if fields else None
+        yield attrs, geom
+
+# coclass names for the shape and its parts by esriGeometryType
+SHAPE_CLASSES = {
+                  GEOMETRY_MULTIPOINT: ('Multipoint', None),
+                  GEOMETRY_POLYLINE: ('Polyline', 'Path'),
+                  GEOMETRY_POLYGON: ('Polygon', 'Ring')
+                }
+
+def _setWKSPoints(obj, coords, start, stop):
+    """sets the vertices of obj to coords[start:stop] with one SetWKSPoints call"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    pPC4 = arcobjects.CType(obj, esriGeometry.IPointCollection4)
+    pPC4._IPointCollection4__com_SetWKSPoints(int(stop - start), _wksPointer(coords, start))
+
+def _buildShape(geomType, coords, rings):
+    """creates one IGeometry from coords using the ring offsets in rings"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    if geomType == GEOMETRY_POINT:
+        pPt = arcobjects.NewObj(esriGeometry.Point, esriGeometry.IPoint)
+        pPt.PutCoords(float(coords[rings[0], 0]), float(coords[rings[0], 1]))
+        return arcobjects.CType(pPt, esriGeometry.IGeometry)
+
+    shapeClass, partClass = SHAPE_CLASSES[geomType]
+    shape = arcobjects.NewObj(getattr(esriGeometry, shapeClass), esriGeometry.IGeometry)
+    if partClass is None or len(rings) == 2:
+        # single part, the vertices are set on the shape directly
+        _setWKSPoints(shape, coords, rings[0], rings[-1])
+        return shape
+
+    pGC = arcobjects.CType(shape, esriGeometry.IGeometryCollection)
+    for i in range(len(rings) - 1):
+        part = arcobjects.NewObj(getattr(esriGeometry, partClass), esriGeometry.IGeometry)
+        _setWKSPoints(part, coords, rings[i], rings[i + 1])
+        pGC.AddGeometry(part)
+    return shape
+
+def _setAware(shape, has_z, has_m, default_z):
+    """makes a shape Z and/or M aware, every vertex gets default_z, Ms are left NaN"""
+    import comtypes.gen.esriGeometry as esriGeometry
+    if has_z:
+        arcobjects.CType(shape, esriGeometry.IZAware).ZAware = True
+        if shape.GeometryType == GEOMETRY_POINT:
+            arcobjects.CType(shape, esriGeometry.IPoint).Z = default_z
+        else:
+            arcobjects.CType(shape, esriGeometry.IZ).SetConstantZ(default_z)
+    if has_m:
+        arcobjects.CType(shape, esriGeometry.IMAware).MAware = True
+
+def NumPyToShapes(arrays, geometry_type=None, spatial_reference=None, simplify=False,
+                  has_z=False, has_m=False, default_z=0.0):
+    """Creates shapes from numpy coordinate and offset arrays
+
+    This is the inverse of ShapesToNumPy().  Vertices are set with one
+    IPointCollection4.SetWKSPoints call per shape (or per path/ring for multipart
+    shapes) instead of creating a Point for every vertex.
+
+    Required:
+    arrays -- GeometryArrays tuple (or any object with coords, ring_offsets,
+        part_offsets and geom_offsets attributes)
+
+    Optional:
+    geometry_type -- esriGeometryType code, needed if arrays has no geometry_type
+    spatial_reference -- ISpatialReference to assign to each shape
+    simplify -- simplify each shape after it is built.  Default is False
+    has_z -- make the shapes Z aware, as needed for a feature class with Z
+        values.  Default is False
+    has_m -- make the shapes M aware (with NaN Ms).  Default is False
+    default_z -- Z value of every vertex when has_z is True.  Default is 0
+
+    returns a list of IGeometry pointers, None for shapes with no parts
+    """
+    import numpy
+    import comtypes.gen.esriGeometry as esriGeometry
+    if geometry_type is None:
+        geometry_type = getattr(arrays, 'geometry_type', None)
+    if geometry_type is None:
+        raise ValueError('geometry_type is required!')
+    coords = numpy.ascontiguousarray(arrays.coords, numpy.float64)
+    rings = numpy.asarray(arrays.ring_offsets)
+    parts = numpy.asarray(arrays.part_offsets)
+    geoms = numpy.asarray(arrays.geom_offsets)
+
+    shapes = []
+    for g in xrange(len(geoms) - 1):
+        p0, p1 = geoms[g], geoms[g + 1]
+        if p0 == p1:
+            shapes.append(None)
+            continue
+        shape = _buildShape(geometry_type, coords, rings[parts[p0]:parts[p1] + 1])
+        if has_z or has_m:
+            _setAware(shape, has_z, has_m, default_z)
+        if spatial_reference is not None:
+            shape.SpatialReference = spatial_reference
+        if simplify:
+            pTopo = arcobjects.CType(shape, esriGeometry.ITopologicalOperator2)
+            pTopo.IsKnownSimple_2 = False
+            pTopo.Simplify()
+        shapes.append(shape)
+    return shapes
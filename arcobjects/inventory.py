@@ -0,0 +1,256 @@
+import arcobjects
+import fnmatch
+import json
+import os
+import sqlite3
+import time
+
+# default inventory database, next to arcobjects.INSTALL_MANIFEST
+INVENTORY_DB = os.path.join(os.path.dirname(arcobjects.INSTALL_MANIFEST), 'inventory.sqlite')
+
+MXD = 'mxd'
+GDB = 'gdb'
+
+def Signature(path):
+    """returns (size, mtime) used to tell if a map document or file geodatabase
+    changed without opening it
+
+    A file geodatabase is a folder, so its size is the total of its files and
+    its mtime is the newest of them.  Lock files are left out since they come
+    and go whenever the geodatabase is opened.
+    """
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    size, mtime = 0, os.path.getmtime(path)
+    for name in os.listdir(path):
+        if name.lower().endswith('.lock'):
+            continue
+        st = os.stat(os.path.join(path, name))
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime)
+    return size, mtime
+
+def _kind(path):
+    """returns MXD or GDB for a path"""
+    ext = os.path.splitext(path.rstrip('\\/'))[1].lower()
+    if ext == '.mxd':
+        return MXD
+    if ext == '.gdb':
+        return GDB
+    raise ValueError('"{}" is not a map document or file geodatabase!'.format(path))
+
+def _layerSources(obj, mapName, layers):
+    """appends name, source and valid for every layer in a map or group layer"""
+    import comtypes.gen.esriCarto as esriCarto
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    if isinstance(obj, esriCarto.IMap):
+        count = obj.LayerCount
+    else:
+        count = obj.Count
+    for i in range(count):
+        layer = obj.Layer(i)
+        pCL = arcobjects.CType(layer, esriCarto.ICompositeLayer)
+        if isinstance(arcobjects.CType(layer, esriCarto.IGroupLayer), esriCarto.IGroupLayer):
+            _layerSources(pCL, mapName, layers)
+            continue
+
+        # the data source name is read without opening the data
+        source = None
+        pDL = arcobjects.CType(layer, esriCarto.IDataLayer2)
+        if pDL is not None:
+            pDSN = arcobjects.CType(pDL.DataSourceName, esriGeoDatabase.IDatasetName)
+            if pDSN is not None:
+                source = os.path.join(pDSN.WorkspaceName.PathName, pDSN.Name)
+        layers.append({'map': mapName, 'name': layer.Name, 'source': source,
+                       'valid': bool(layer.Valid)})
+
+def _readMxd(path):
+    """opens a map document once and returns its version and layer sources"""
+    arcobjects.InitStandalone()
+    import comtypes.gen.esriCarto as esriCarto
+    pMapDoc = arcobjects.NewObj(esriCarto.MapDocument, esriCarto.IMapDocument)
+    pMapDoc.Open(path)
+    try:
+        ver_info = pMapDoc.GetVersionInfo()
+        version = None
+        if not ver_info[0]:
+            version = '.'.join(map(str, ver_info[1:3]))
+        layers = []
+        for i in range(pMapDoc.MapCount):
+            pMap = pMapDoc.Map(i)
+            _layerSources(pMap, pMap.Name, layers)
+    finally:
+        pMapDoc.Close()
+    return {'version': version, 'layers': layers}
+
+def _readGDB(path):
+    """opens a file geodatabase once and returns its release and dataset stats"""
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    pWS = arcobjects.OpenWorkspace(path)
+    pGDBRelease = arcobjects.CType(pWS, esriGeoDatabase.IGeodatabaseRelease2)
+    release = (pGDBRelease.CurrentRelease, pGDBRelease.MajorVersion, pGDBRelease.MinorVersion)
+    datasets = [stat._asdict() for stat in arcobjects.GetDatasetStats(path)]
+    return {'release': release, 'datasets': datasets}
+
+READERS = {MXD: _readMxd, GDB: _readGDB}
+
+class Inventory(object):
+    """SQLite store of map document and file geodatabase metadata
+
+    Entries are keyed by path and are only read again when the file's size or
+    mtime (see Signature()) changes, so repeat queries are answered without
+    opening anything.  Entries that could not be read (locked or damaged
+    files) are read again every time.  Map documents record their version and layer sources,
+    file geodatabases their release and the stat info of every dataset.
+
+    A connection can only be used by the thread that created it.
+
+    Optional:
+    db -- path to the database file.  Default is INVENTORY_DB
+
+    # example usage:
+    with Inventory() as inv:
+        inv.Crawl(r'\\\\server\\gis')
+        print inv.MxdVersion(r'\\\\server\\gis\\maps\\parcels.mxd')
+    """
+    def __init__(self, db=None):
+        self.db = db or INVENTORY_DB
+        folder = os.path.dirname(os.path.abspath(self.db))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.conn = sqlite3.connect(self.db)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                          'path TEXT PRIMARY KEY, kind TEXT, size INTEGER, mtime REAL, '
+                          'info TEXT, error TEXT, scanned REAL)')
+        self.conn.commit()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path.rstrip('\\/')))
+
+    def _row(self, key):
+        return self.conn.execute('SELECT size, mtime, info, error FROM entries WHERE path = ?',
+                                 (key,)).fetchone()
+
+    def _update(self, key, signature, commit=True):
+        """reads an entry with arcobjects and stores it, returns (info, error)"""
+        kind, info, error = None, None, None
+        try:
+            kind = _kind(key)
+            info = READERS[kind](key)
+        except Exception as e:
+            error = '{}: {}'.format(e.__class__.__name__, e)
+        self.conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (key, kind, signature[0], signature[1],
+                           json.dumps(info) if info is not None else None, error, time.time()))
+        if commit:
+            self.conn.commit()
+        return info, error
+
+    def _get(self, path, refresh=False, commit=True):
+        """returns (info, error, updated) for a path"""
+        key = self._key(path)
+        signature = Signature(key)
+        row = None if refresh else self._row(key)
+        # a failed read may have been a lock or a file still being copied
+        if row is not None and tuple(row[:2]) == signature and not row[3]:
+            return (json.loads(row[2]) if row[2] else None), row[3], False
+        info, error = self._update(key, signature, commit)
+        return info, error, True
+
+    def Get(self, path, refresh=False):
+        """returns the metadata dictionary for a map document or file
+        geodatabase, reading it only if it is not stored or has changed
+
+        Optional:
+        refresh -- read it even if it has not changed.  Default is False
+        """
+        info, error, updated = self._get(path, refresh)
+        if error:
+            raise IOError('"{}" could not be read: {}'.format(path, error))
+        return info
+
+    def MxdVersion(self, path):
+        """see arcobjects.mxd_version()"""
+        return self.Get(path)['version']
+
+    def LayerSources(self, path):
+        """returns a list of layer dictionaries (map, name, source, valid) for a map document"""
+        return self.Get(path)['layers']
+
+    def GDBRelease(self, path):
+        """see arcobjects.CheckGDBRelease()"""
+        return tuple(self.Get(path)['release'])
+
+    def DatasetStats(self, path):
+        """returns a list of dataset dictionaries with the fields of
+        arcobjects.DatasetStat for a file geodatabase"""
+        return self.Get(path)['datasets']
+
+    def Crawl(self, folder, patterns=('*.mxd', '*.gdb'), recursive=True, prune=True):
+        """Brings the inventory up to date for every map document and file
+        geodatabase under a folder, only changed entries are read
+
+        Optional:
+        patterns -- file (and .gdb folder) name patterns
+        recursive -- also crawl sub folders.  Default is True
+        prune -- remove entries for files under folder that no longer exist.
+            Default is True
+
+        returns a dictionary of counts for unchanged, updated, failed and removed
+        """
+        counts = dict.fromkeys(('unchanged', 'updated', 'failed', 'removed'), 0)
+        seen = set()
+        for root, dirs, files in os.walk(folder):
+            gdbs = [d for d in dirs if d.lower().endswith('.gdb')]
+            # do not walk into file geodatabases
+            dirs[:] = [d for d in dirs if d not in gdbs] if recursive else []
+            for name in files + gdbs:
+                if not any(fnmatch.fnmatch(name.lower(), p) for p in patterns):
+                    continue
+                path = os.path.join(root, name)
+                seen.add(self._key(path))
+                info, error, updated = self._get(path, commit=False)
+                if error:
+                    counts['failed'] += 1
+                elif updated:
+                    counts['updated'] += 1
+                else:
+                    counts['unchanged'] += 1
+            self.conn.commit()
+
+        if prune:
+            top = self._key(folder)
+            stale = [row[0] for row in self.conn.execute('SELECT path FROM entries')
+                     if row[0] not in seen and row[0].startswith(top + os.sep) and
+                     (recursive or os.path.dirname(row[0]) == top)]
+            for path in stale:
+                if not os.path.exists(path):
+                    self.conn.execute('DELETE FROM entries WHERE path = ?', (path,))
+                    counts['removed'] += 1
+            self.conn.commit()
+        return counts
+
+    def Remove(self, path=None):
+        """removes an entry, or every entry if no path is given"""
+        if path is None:
+            self.conn.execute('DELETE FROM entries')
+        else:
+            self.conn.execute('DELETE FROM entries WHERE path = ?', (self._key(path),))
+        self.conn.commit()
+
+    def __contains__(self, path):
+        return self._row(self._key(path)) is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
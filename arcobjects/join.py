@@ -0,0 +1,269 @@
+import os
+import shutil
+import tempfile
+from arcobjects_remote.nulls import null_for, null_mask
+
+class KeyIndex(object):
+    """Index from join key to row numbers for the build side of a join
+
+    The keys are sorted once with numpy and looked up with searchsorted, so
+    the index is two compact arrays (sorted keys and their row numbers)
+    instead of a dictionary entry per row, and a whole probe chunk is matched
+    in a few vectorized calls.
+
+    Required:
+    keys -- numpy array of join keys, null keys are left out
+    """
+    def __init__(self, keys):
+        import numpy
+        rows = numpy.flatnonzero(~null_mask(keys))
+        order = numpy.argsort(keys[rows], kind='mergesort')
+        self.rows = rows[order]
+        self.keys = keys[self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, probe):
+        """matches an array of probe keys
+
+        returns (probe row numbers, build row numbers, matches per probe row),
+        with one pair of row numbers for every match
+        """
+        import numpy
+        # null keys never match and are not searched for
+        valid = ~null_mask(probe)
+        lo = numpy.zeros(len(probe), numpy.intp)
+        hi = numpy.zeros(len(probe), numpy.intp)
+        lo[valid] = numpy.searchsorted(self.keys, probe[valid], 'left')
+        hi[valid] = numpy.searchsorted(self.keys, probe[valid], 'right')
+        counts = hi - lo
+        probeRows = numpy.repeat(numpy.arange(len(probe)), counts)
+        # position of each match within its run of equal keys
+        starts = numpy.repeat(lo - (numpy.cumsum(counts) - counts), counts)
+        buildRows = self.rows[starts + numpy.arange(len(probeRows))]
+        return probeRows, buildRows, counts
+
+def _joinDtype(probeDtype, buildDtype, fields, suffix, how, null_value):
+    """returns the output dtype and a list of (build field, output field)"""
+    import numpy
+    descr = [(n, probeDtype[n]) for n in probeDtype.names]
+    names = set(probeDtype.names)
+    mapping = []
+    for f in fields:
+        name = f + suffix if f in names else f
+        dt = buildDtype[f]
+        if how == 'left' and dt.kind in 'iub' and null_value is None:
+            # unmatched rows need a null
+            dt = numpy.dtype('f8')
+        descr.append((name, dt))
+        names.add(name)
+        mapping.append((f, name))
+    return numpy.dtype(descr), mapping
+
+class _Joiner(object):
+    """joins probe chunks against one in memory build array"""
+    def __init__(self, build, build_key, key, fields, suffix, how, null_value, probeDtype):
+        self.build = build
+        self.index = KeyIndex(build[build_key])
+        self.key, self.how, self.null_value = key, how, null_value
+        self.dtype, self.mapping = _joinDtype(probeDtype, build.dtype, fields, suffix, how, null_value)
+
+    def join(self, chunk):
+        import numpy
+        probeRows, buildRows, counts = self.index.lookup(chunk[self.key])
+        unmatched = None
+        if self.how == 'left':
+            unmatched = numpy.flatnonzero(counts == 0)
+            if len(unmatched):
+                # unmatched rows go back in probe order
+                order = numpy.argsort(numpy.concatenate([probeRows, unmatched]), kind='mergesort')
+                probeRows = numpy.concatenate([probeRows, unmatched])[order]
+                isNull = numpy.concatenate([numpy.zeros(len(buildRows), bool),
+                                            numpy.ones(len(unmatched), bool)])[order]
+                buildRows = numpy.concatenate([buildRows, numpy.zeros(len(unmatched), buildRows.dtype)])[order]
+            else:
+                unmatched = None
+
+        out = numpy.empty(len(probeRows), self.dtype)
+        for name in chunk.dtype.names:
+            out[name] = chunk[name][probeRows]
+        for f, name in self.mapping:
+            if len(self.build):
+                out[name] = self.build[f][buildRows]
+            if unmatched is not None:
+                kind = out.dtype[name].kind
+                out[name][isNull] = self.null_value if kind in 'iub' else null_for(kind)
+        return out
+
+def _partitionOf(keys, partitions):
+    """returns the spill partition of each key"""
+    import numpy
+    kind = keys.dtype.kind
+    if kind in 'iubf':
+        # numbers are compared as float64 so an int key and a float key that
+        # are equal land in the same partition (-0.0 is made 0.0 first)
+        bits = numpy.ascontiguousarray(keys.astype('f8') + 0.0)
+        return bits.view('i8') % partitions
+    if kind == 'M':
+        return keys.astype('i8') % partitions
+    return numpy.array([hash(k) for k in keys], 'i8') % partitions
+
+class _Spill(object):
+    """numpy files for the partitions of one side of a join"""
+    def __init__(self, folder, side, partitions):
+        self.folder, self.side = folder, side
+        self.files = [[] for i in range(partitions)]
+
+    def write(self, chunk, key):
+        import numpy
+        parts = _partitionOf(chunk[key], len(self.files))
+        for p in numpy.unique(parts):
+            path = os.path.join(self.folder, '{}_{}_{}.npy'.format(self.side, p, len(self.files[p])))
+            numpy.save(path, chunk[parts == p])
+            self.files[p].append(path)
+
+    def read(self, p):
+        """yields the chunks of partition p"""
+        import numpy
+        for path in self.files[p]:
+            try:
+                yield numpy.load(path, allow_pickle=True)
+            except TypeError:
+                # older numpy always allows pickled (object) arrays
+                yield numpy.load(path)
+
+def HashJoin(probe, build, key, build_key=None, how='inner', fields=None, suffix='_1',
+             null_value=None, max_build_bytes=None, partitions=16, spill_dir=None):
+    """Joins a stream of numpy chunks to a smaller table on a key field
+
+    The build table is read into memory and indexed with a KeyIndex, then the
+    probe chunks are matched against it one at a time, so the larger table is
+    never held in memory.  Every match of a probe row is returned (one to many
+    joins repeat the probe row).
+
+    If the build table grows past max_build_bytes, both sides are split into
+    partitions by key and spilled to numpy files, and each partition is joined
+    on its own.  Chunks then come out grouped by partition instead of in probe
+    order.
+
+    Required:
+    probe -- iterable of numpy structured arrays, such as a ChunkedSearchCursor
+        on the larger table
+    build -- numpy structured array or iterable of them for the smaller table
+    key -- join field in probe
+
+    Optional:
+    build_key -- join field in build.  Default is key
+    how -- 'inner' or 'left' (keep probe rows without a match).  Default is 'inner'
+    fields -- build fields to add.  Default is every build field except build_key
+    suffix -- added to build field names that are already in probe.  Default is _1
+    null_value -- value for integer build fields in unmatched left join rows.
+        Default is None which makes those fields float64 with nan
+    max_build_bytes -- spill to disk when the build table is larger.  Default
+        is None which never spills
+    partitions -- number of spill partitions.  Default is 16
+    spill_dir -- folder for spill files.  Default is the temp folder
+
+    yields joined numpy structured arrays
+
+    # example usage:
+    owners = ChunkedSearchCursor(owner_table, ['PIN', 'OWNER'])
+    parcels = ChunkedSearchCursor(parcel_fc, ['OBJECTID', 'PIN', 'ACRES'])
+    for chunk in HashJoin(parcels, owners, 'PIN', how='left'):
+        print chunk[['PIN', 'OWNER']][:5]
+    """
+    import numpy
+    if how not in ('inner', 'left'):
+        raise ValueError('"{}" is not a valid join type!'.format(how))
+    build_key = build_key or key
+    if hasattr(build, 'dtype'):
+        build = [build]
+
+    # read the build side, spilling it if it gets too big
+    chunks, size, rows, buildDtype = [], 0, 0, None
+    spill, folder = None, None
+    try:
+        for chunk in build:
+            if buildDtype is None:
+                buildDtype = chunk.dtype
+            rows += len(chunk)
+            if spill is not None:
+                spill.write(chunk, build_key)
+                continue
+            chunks.append(chunk)
+            size += chunk.nbytes
+            if max_build_bytes is not None and size > max_build_bytes:
+                folder = tempfile.mkdtemp(prefix='join_', dir=spill_dir)
+                spill = _Spill(folder, 'build', partitions)
+                for c in chunks:
+                    spill.write(c, build_key)
+                chunks = []
+        if buildDtype is None:
+            raise ValueError('build has no chunks, pass an empty array for an empty table!')
+        if not rows and how == 'inner':
+            return
+        if fields is None:
+            fields = [f for f in buildDtype.names if f != build_key]
+        fields = list(fields)
+
+        if spill is None:
+            joiner = None
+            for chunk in probe:
+                if joiner is None:
+                    joiner = _Joiner(numpy.concatenate(chunks), build_key, key, fields, suffix, how,
+                                     null_value, chunk.dtype)
+                    chunks = None
+                out = joiner.join(chunk)
+                if len(out):
+                    yield out
+            return
+
+        # spill the probe side with the same partitioning, then join each partition
+        probeSpill = _Spill(folder, 'probe', partitions)
+        probeDtype = None
+        for chunk in probe:
+            probeDtype = chunk.dtype
+            probeSpill.write(chunk, key)
+        for p in range(partitions):
+            if not probeSpill.files[p] or (how == 'inner' and not spill.files[p]):
+                continue
+            parts = list(spill.read(p)) or [numpy.empty(0, buildDtype)]
+            joiner = _Joiner(numpy.concatenate(parts), build_key, key, fields, suffix, how,
+                             null_value, probeDtype)
+            for chunk in probeSpill.read(p):
+                out = joiner.join(chunk)
+                if len(out):
+                    yield out
+    finally:
+        if folder:
+            shutil.rmtree(folder, ignore_errors=True)
+
+def JoinTables(probe_fc, probe_fields, build_fc, build_fields, key, build_key=None,
+               how='inner', chunk_size=10000, where=None, build_where=None, **kwargs):
+    """Joins two tables with HashJoin() using ChunkedSearchCursor, put the
+    smaller table on the build side
+
+    Required:
+    probe_fc, build_fc -- table or feature class pointers
+    probe_fields, build_fields -- field names to read from each, including the keys
+    key -- join field in probe_fc
+
+    Optional:
+    build_key -- join field in build_fc.  Default is key
+    how -- 'inner' or 'left'.  Default is 'inner'
+    chunk_size -- rows per chunk.  Default is 10000
+    where, build_where -- where clauses for each table
+    kwargs -- other HashJoin() arguments
+
+    yields joined numpy structured arrays
+    """
+    import itertools
+    import numpy
+    import arcobjects
+    probe = arcobjects.ChunkedSearchCursor(probe_fc, probe_fields, chunk_size, where=where)
+    build = arcobjects.ChunkedSearchCursor(build_fc, build_fields, chunk_size, where=build_where)
+
+    # an empty first chunk gives the build dtype even if no rows match
+    empty = numpy.empty(0, arcobjects.ChunkReader(build_fc, build_fields).dtype)
+    return HashJoin(probe, itertools.chain([empty], build), key, build_key, how, **kwargs)
@@ -0,0 +1,144 @@
+import arcobjects
+import collections
+import fnmatch
+import glob
+import json
+import multiprocessing
+import os
+import time
+import traceback
+
+# result for one map document, error and traceback are None when ok is True
+DocumentResult = collections.namedtuple('DocumentResult', 'path ok result error traceback seconds')
+
+def FindDocuments(source, pattern='*.mxd', recursive=True):
+    """returns a sorted list of map documents
+
+    Required:
+    source -- folder to search, a glob pattern (such as C:\maps\*\*.mxd) or
+        a list of paths
+
+    Optional:
+    pattern -- file name pattern used when source is a folder.  Default is *.mxd
+    recursive -- also search sub folders of a folder.  Default is True
+    """
+    if not isinstance(source, basestring):
+        return sorted(os.path.abspath(p) for p in source)
+    if not os.path.isdir(source):
+        return sorted(os.path.abspath(p) for p in glob.glob(source))
+    found = []
+    for root, dirs, files in os.walk(source):
+        found.extend(os.path.join(root, f) for f in fnmatch.filter(files, pattern))
+        if not recursive:
+            break
+    return sorted(os.path.abspath(p) for p in found)
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def LoadCheckpoint(checkpoint):
+    """reads a checkpoint file written by RunDocuments(), returns a dictionary
+    of DocumentResult by normalized path (the last entry for a path wins)"""
+    done = {}
+    if not checkpoint or not os.path.exists(checkpoint):
+        return done
+    with open(checkpoint, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # partial line from a crash while writing
+                continue
+            done[_key(entry['path'])] = DocumentResult(**entry)
+    return done
+
+def _jsonable(value):
+    """returns value if it can be written to the checkpoint, else its repr"""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+def _initWorker():
+    """pool initializer, checks out the license once per process"""
+    arcobjects.InitStandalone()
+
+def _runDocument(args):
+    """runs operation on one map document in a worker"""
+    path, operation, kwargs = args
+    start = time.time()
+    try:
+        if isinstance(operation, basestring):
+            operation = getattr(arcobjects, operation)
+        result = operation(path, **kwargs)
+        return DocumentResult(path, True, _jsonable(result), None, None, time.time() - start)
+    except Exception as e:
+        return DocumentResult(path, False, None, '{}: {}'.format(e.__class__.__name__, e),
+                              traceback.format_exc(), time.time() - start)
+
+def RunDocuments(source, operation, processes=None, checkpoint=None, retry_errors=False,
+                 pattern='*.mxd', recursive=True, maxtasksperchild=None, **kwargs):
+    """Runs an operation on many map documents with a pool of worker processes
+
+    Each worker checks out the license once and keeps it for every document it
+    handles.  Exceptions are caught per document and returned as results, so
+    one bad document does not stop the batch.  When a checkpoint file is given,
+    every result is appended to it as soon as it is ready and documents that
+    are already in it are skipped, so a crashed run can be started again with
+    the same arguments to pick up where it stopped.
+
+    Required:
+    source -- folder, glob pattern or list of map documents, see FindDocuments()
+    operation -- name of an arcobjects function (such as 'mxd_version' or
+        'setSymbolSize') or a module level function called as
+        operation(path, **kwargs).  Its result should be JSON serializable to
+        be kept in the checkpoint, otherwise its repr is stored.
+
+    Optional:
+    processes -- number of worker processes.  Default is the number of cpus
+    checkpoint -- path to a checkpoint file (one JSON result per line)
+    retry_errors -- run documents that failed in a previous run again.
+        Default is False
+    pattern, recursive -- see FindDocuments()
+    maxtasksperchild -- documents a worker handles before it is replaced,
+        limits memory growth from leaky documents.  Default is no limit
+    kwargs -- extra keyword arguments for operation
+
+    yields a DocumentResult for each document as it finishes
+
+    # example usage (scripts using this need an if __name__ == '__main__' guard):
+    if __name__ == '__main__':
+        for res in RunDocuments(r'C:\maps', 'setSymbolSize', checkpoint=r'C:\TEMP\resize.log',
+                                do_all=True, pointSize=10):
+            if not res.ok:
+                print res.path, res.error
+    """
+    done = LoadCheckpoint(checkpoint)
+    tasks = []
+    for path in FindDocuments(source, pattern, recursive):
+        previous = done.get(_key(path))
+        if previous is not None and (previous.ok or not retry_errors):
+            continue
+        tasks.append((path, operation, kwargs))
+    if not tasks:
+        return
+
+    log = open(checkpoint, 'a') if checkpoint else None
+    pool = multiprocessing.Pool(processes, initializer=_initWorker,
+                                maxtasksperchild=maxtasksperchild)
+    try:
+        for res in pool.imap_unordered(_runDocument, tasks):
+            if log:
+                log.write(json.dumps(res._asdict()) + '\n')
+                log.flush()
+                os.fsync(log.fileno())
+            yield res
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        if log:
+            log.close()
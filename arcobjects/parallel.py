@@ -0,0 +1,120 @@
+import arcobjects
+import multiprocessing
+import os
+
+# per process state for pool workers, set by _initWorker()
+_worker = {}
+
+def OIDRange(fc, where=None):
+    """returns the (minimum, maximum) OID of a feature class or None if no
+    features match
+
+    Required:
+    fc -- IFeatureClass pointer
+
+    Optional:
+    where -- where clause
+    """
+    oidField = fc.OIDFieldName
+    bounds = []
+    for order in ('ASC', 'DESC'):
+        qf = arcobjects.MakeQueryFilter(fc, where, [oidField],
+                                        postfix='ORDER BY {0} {1}'.format(oidField, order))
+        ft = fc.Search(qf, True).NextFeature()
+        if not ft:
+            return None
+        bounds.append(ft.OID)
+    return tuple(bounds)
+
+def SplitOIDRange(lo, hi, step):
+    """splits OIDs lo through hi into a list of (after, upto) ranges spanning
+    at most step OIDs each"""
+    ranges = []
+    after = lo - 1
+    while after < hi:
+        upto = min(after + step, hi)
+        ranges.append((after, upto))
+        after = upto
+    return ranges
+
+def _initWorker(fc_path):
+    """pool initializer, checks out the license and opens the feature class once per process"""
+    arcobjects.InitStandalone()
+    _worker['fc'] = arcobjects.OpenFeatureClass(*os.path.split(fc_path))
+
+def _scanRange(args):
+    """scans one OID range in a worker, returns a list of chunks or reduced results"""
+    from arcobjects import geometry
+    after, upto, fields, where, chunk_size, null_value, shape, reducer = args
+    fc = _worker['fc']
+    schema = arcobjects.GetSchema(fc)
+    if shape:
+        fields = fields + [schema.shape_field]
+    reader = arcobjects.ChunkReader(fc, fields, null_value)
+    cur = fc.Search(arcobjects._oidFilter(fc, after, upto, where, fields), True)
+    results = []
+    for chunk in reader.chunks(cur, chunk_size):
+        if shape:
+            # geometry pointers can not be pickled, send coordinate arrays instead
+            geom = geometry.ShapesToNumPy(chunk[str(schema.shape_field)])
+            names = [str(f) for f in fields[:-1]]
+            chunk = (chunk[names].copy() if names else None, geom)
+        results.append(reducer(chunk) if reducer else chunk)
+    return results
+
+def ParallelScan(fc_path, fields, reducer=None, processes=None, chunk_size=10000,
+                 where=None, null_value=None, shape=False, ordered=False):
+    """Scans a feature class with a pool of worker processes
+
+    The feature class is split into OID ranges of chunk_size OIDs.  Each worker
+    checks out the license and opens the feature class once, then scans ranges
+    with a ChunkReader and sends the arrays (or reducer results) back through
+    the pool's pipes.
+
+    Required:
+    fc_path -- full path to feature class (COM pointers can not be shared
+        between processes)
+    fields -- list of field names
+
+    Optional:
+    reducer -- function applied to each chunk in the worker, must be a module
+        level function so it can be pickled.  Only its results are sent back.
+    processes -- number of worker processes.  Default is the number of cpus
+    chunk_size -- OIDs per range, and the maximum rows per chunk.  Default is 10000
+    where -- where clause
+    null_value -- see arcobjects.ChunkedSearchCursor()
+    shape -- also return the shapes, chunks become (attribute array, GeometryArrays)
+        tuples, see arcobjects.geometry.ShapesToNumPy().  Default is False
+    ordered -- yield chunks in OID order.  Default is False which yields them
+        as soon as they are ready
+
+    # example usage (scripts using this need an if __name__ == '__main__' guard):
+    def acres(chunk):
+        return chunk['ACRES'].sum()
+
+    if __name__ == '__main__':
+        print sum(ParallelScan(r'C:\TEMP\parcels.gdb\parcels', ['ACRES'], acres))
+    """
+    arcobjects.InitStandalone()
+    fields = list(fields)
+    fc = arcobjects.OpenFeatureClass(*os.path.split(fc_path))
+    if fc is None:
+        raise ValueError('"{}" does not exist!'.format(fc_path))
+    bounds = OIDRange(fc, where)
+    if bounds is None:
+        return
+    tasks = [(after, upto, fields, where, chunk_size, null_value, shape, reducer)
+             for after, upto in SplitOIDRange(bounds[0], bounds[1], chunk_size)]
+
+    pool = multiprocessing.Pool(processes, initializer=_initWorker, initargs=(fc_path,))
+    try:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        for results in mapper(_scanRange, tasks):
+            for result in results:
+                yield result
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
@@ -0,0 +1,267 @@
+import arcobjects
+import hashlib
+import os
+import struct
+import tempfile
+from arcobjects_remote.framing import array_bytes
+
+# default cache folder, next to arcobjects.INSTALL_MANIFEST
+QUERY_CACHE_DIR = os.path.join(os.path.dirname(arcobjects.INSTALL_MANIFEST), 'query_cache')
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:20]
+
+def _isPath(fc):
+    return isinstance(fc, basestring)
+
+def _filterKey(spatial_filter):
+    """returns a hashable key for a spatial filter (ISpatialFilter, geometry
+    or (xmin, ymin, xmax, ymax) tuple)"""
+    import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+    if spatial_filter is None or isinstance(spatial_filter, tuple):
+        return spatial_filter
+    if isinstance(spatial_filter, esriGeoDatabase.ISpatialFilter):
+        return ('filter', spatial_filter.SpatialRel, spatial_filter.WhereClause,
+                _filterKey(spatial_filter.Geometry))
+    if spatial_filter.GeometryType == 5:
+        # envelope
+        pEnv = spatial_filter
+        return ('envelope', pEnv.XMin, pEnv.YMin, pEnv.XMax, pEnv.YMax)
+    from arcobjects import geometry
+    arrays = geometry.ShapeToNumPy(spatial_filter)
+    return ('shape', arrays.geometry_type,
+            _digest([array_bytes(a) for a in arrays[:4]]))
+
+def _npyHeader(dtype, count, size=None):
+    """returns a version 1.0 .npy header for count rows of dtype, padded to
+    size bytes (or to a multiple of 64 with room for any row count)"""
+    import numpy.lib.format
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        numpy.lib.format.dtype_to_descr(dtype), count)
+    prefix = 10
+    if size is None:
+        size = prefix + len(header) + 21
+        size += -size % 64
+    if prefix + len(header) + 1 > size:
+        raise ValueError('row count does not fit in the header')
+    header = header.ljust(size - prefix - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+class _NpyWriter(object):
+    """streams chunks to a temporary .npy file, the header is written again
+    with the row count when the file is committed"""
+    def __init__(self, folder, dtype):
+        self.dtype = dtype
+        self.rows = 0
+        self.nbytes = 0
+        fd, self.tmp = tempfile.mkstemp(suffix='.tmp', dir=folder)
+        self.file = os.fdopen(fd, 'wb')
+        self.header = _npyHeader(dtype, 0)
+        self.file.write(self.header)
+
+    def write(self, chunk):
+        import numpy
+        chunk = numpy.ascontiguousarray(chunk)
+        self.file.write(array_bytes(chunk))
+        self.rows += len(chunk)
+        self.nbytes += chunk.nbytes
+
+    def commit(self, path):
+        """writes the final header and moves the file to path"""
+        self.file.seek(0)
+        self.file.write(_npyHeader(self.dtype, self.rows, len(self.header)))
+        self.file.close()
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(self.tmp, path)
+
+    def discard(self):
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+class QueryCache(object):
+    """Opt in cache of ChunkedSearchCursor results stored as numpy files
+
+    Results are keyed by (workspace, dataset, fields, where, spatial filter,
+    postfix) plus a version token for the dataset, so a cached result is only
+    used while the data is unchanged:
+
+        file geodatabase path -- size and mtime of the geodatabase's files, see
+            arcobjects.inventory.Signature().  No COM calls are made for a hit.
+        table pointer -- IDatasetFileStat modified time, or for a versioned
+            SDE workspace the version name and IVersionInfo.Modified time
+
+    Datasets with no token (such as non versioned SDE data) are never cached.
+    Results with object fields (shapes) can not be memory mapped and are not
+    cached either.  Cached results are opened with numpy memory mapping and
+    returned as read only arrays.  Results are streamed to disk as they are
+    read, and a result larger than max_bytes is not cached.  The least
+    recently used files are removed when the folder grows past max_bytes.
+
+    Optional:
+    folder -- cache folder.  Default is QUERY_CACHE_DIR
+    max_bytes -- size limit for the folder.  Default is 512 MB
+
+    # example usage:
+    cache = QueryCache()
+    for chunk in cache.ChunkedSearchCursor(r'C:\\TEMP\\parcels.gdb\\parcels', ['ACRES'],
+                                           where="ZONING = 'AG'"):
+        print chunk['ACRES'].sum()
+    """
+    def __init__(self, folder=None, max_bytes=512 * 1024 * 1024):
+        self.folder = folder or QUERY_CACHE_DIR
+        self.max_bytes = max_bytes
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        self.hits = 0
+        self.misses = 0
+
+    def _dataset(self, fc):
+        """returns (workspace path, dataset name) for a path or table pointer"""
+        if _isPath(fc):
+            gdb, name = os.path.split(fc)
+            return os.path.normcase(os.path.abspath(gdb)), name.lower()
+        return arcobjects._datasetKey(fc)[0]
+
+    def token(self, fc):
+        """returns the version token for a path or table pointer, None if the
+        dataset can not be cached"""
+        import comtypes.gen.esriGeoDatabase as esriGeoDatabase
+        if _isPath(fc):
+            from arcobjects.inventory import Signature
+            gdb = os.path.dirname(fc)
+            if gdb.lower().endswith('.gdb') and os.path.isdir(gdb):
+                return ('files',) + Signature(gdb)
+            return None
+        version = arcobjects._datasetKey(fc)[1]
+        if version is not None:
+            return ('stat', version)
+        # edits to non versioned data do not change the version's modified time
+        pVO = arcobjects.CType(fc, esriGeoDatabase.IVersionedObject)
+        if pVO is None or not pVO.IsRegisteredAsVersioned:
+            return None
+        pVersion = arcobjects.CType(arcobjects.CType(fc, esriGeoDatabase.IDataset).Workspace,
+                                    esriGeoDatabase.IVersion)
+        if pVersion is not None:
+            return ('version', pVersion.VersionName, str(pVersion.VersionInfo.Modified))
+        return None
+
+    def _path(self, key, token):
+        # the token kind keeps path and pointer results for a dataset apart
+        return os.path.join(self.folder, '{}_{}_{}.npy'.format(_digest(key), token[0], _digest(token)))
+
+    def _store(self, path, writer):
+        """moves a finished _NpyWriter file to path, then evicts old files"""
+        try:
+            writer.commit(path)
+        except (IOError, OSError):
+            writer.discard()
+            return
+        # results for older versions of the same query are no longer needed
+        prefix = os.path.basename(path).rsplit('_', 1)[0] + '_'
+        for name in os.listdir(self.folder):
+            if name.startswith(prefix) and name != os.path.basename(path):
+                self._remove(os.path.join(self.folder, name))
+        self.Evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            # still memory mapped or already removed
+            pass
+
+    def Evict(self, max_bytes=None):
+        """removes the least recently used files until the folder is under max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        files = []
+        for name in os.listdir(self.folder):
+            if name.endswith('.npy'):
+                path = os.path.join(self.folder, name)
+                st = os.stat(path)
+                files.append((st.st_mtime, st.st_size, path))
+        total = sum(f[1] for f in files)
+        for mtime, size, path in sorted(files):
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+
+    def ChunkedSearchCursor(self, fc, fields, chunk_size=10000, null_value=None,
+                            where=None, spatial_filter=None, postfix=None):
+        """arcobjects.ChunkedSearchCursor() through the cache
+
+        Required:
+        fc -- full path to a feature class or table (hits for file geodatabase
+            paths make no COM calls), or a table pointer
+        fields -- list of field names
+
+        Optional:
+        chunk_size, null_value, where, postfix -- see arcobjects.ChunkedSearchCursor()
+        spatial_filter -- ISpatialFilter, geometry or (xmin, ymin, xmax, ymax) tuple
+        """
+        import numpy
+        fields = list(fields)
+        key = (self._dataset(fc), tuple(f.lower() for f in fields), where,
+               _filterKey(spatial_filter), postfix, repr(null_value))
+        token = self.token(fc)
+        path = self._path(key, token) if token is not None else None
+        if path and os.path.exists(path):
+            try:
+                arr = numpy.load(path, mmap_mode='r')
+            except (IOError, ValueError):
+                arr = None
+            if arr is not None:
+                self.hits += 1
+                # mark as recently used for eviction
+                os.utime(path, None)
+                for start in xrange(0, len(arr), chunk_size):
+                    yield arr[start:start + chunk_size]
+                return
+
+        self.misses += 1
+        if _isPath(fc):
+            pFC = arcobjects.OpenFeatureClass(*os.path.split(fc))
+            if pFC is None:
+                raise ValueError('"{}" does not exist!'.format(fc))
+        else:
+            pFC = fc
+        writer = None
+        if path is not None:
+            dtype = arcobjects.ChunkReader(pFC, fields, null_value).dtype
+            if not dtype.hasobject:
+                writer = _NpyWriter(self.folder, dtype)
+        try:
+            for chunk in arcobjects.ChunkedSearchCursor(pFC, fields, chunk_size, null_value, where,
+                                                        spatial_filter, postfix):
+                if writer is not None:
+                    if len(writer.header) + writer.nbytes + chunk.nbytes > self.max_bytes:
+                        # too big to cache, stop writing it
+                        writer.discard()
+                        writer = None
+                    else:
+                        writer.write(chunk)
+                yield chunk
+            if writer is not None:
+                self._store(path, writer)
+                writer = None
+        finally:
+            # the loop was left early or failed
+            if writer is not None:
+                writer.discard()
+
+    def SearchCursor(self, fc, fields, where=None, spatial_filter=None, postfix=None):
+        """arcobjects.SearchCursor() through the cache, yields a tuple for each row"""
+        for chunk in self.ChunkedSearchCursor(fc, fields, where=where, spatial_filter=spatial_filter,
+                                              postfix=postfix):
+            for row in chunk.tolist():
+                yield row
+
+    def Clear(self):
+        """removes every cached result"""
+        self.Evict(0)
+
+    def __len__(self):
+        return len([n for n in os.listdir(self.folder) if n.endswith('.npy')])
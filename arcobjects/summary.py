@@ -0,0 +1,297 @@
+from arcobjects_remote.nulls import null_for, null_mask
+
+# statistics supported by GroupStats, output fields are named like the
+# Summary Statistics tool, such as SUM_ACRES
+STATISTICS = ('sum', 'count', 'min', 'max', 'mean', 'std', 'distinct')
+
+# statistics that need a numeric field
+NUMERIC = ('sum', 'mean', 'std')
+
+def _caseOrder(key):
+    """sort key for group keys, null case values (None) come first"""
+    return tuple((v is not None, v) for v in key)
+
+class _Partial(object):
+    """running statistics for one field in one group
+
+    The mean and the sum of squared differences from it (m2) are merged with
+    Chan's parallel algorithm so partials from different chunks or processes
+    combine without losing precision.
+    """
+    __slots__ = ('n', 'total', 'mean', 'm2', 'min', 'max', 'distinct')
+
+    def __init__(self, distinct=False):
+        self.n = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.distinct = set() if distinct else None
+
+    def __getstate__(self):
+        return [getattr(self, a) for a in self.__slots__]
+
+    def __setstate__(self, state):
+        for a, v in zip(self.__slots__, state):
+            setattr(self, a, v)
+
+    def merge(self, n, total, mean, m2, lo, hi, distinct):
+        if not n:
+            return
+        if self.n:
+            count = self.n + n
+            delta = mean - self.mean
+            self.mean += delta * n / count
+            self.m2 += m2 + delta * delta * self.n * n / count
+            self.n = count
+        else:
+            self.n, self.mean, self.m2 = n, mean, m2
+        self.total += total
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        if self.distinct is not None and distinct is not None:
+            self.distinct.update(distinct)
+
+class GroupStats(object):
+    """Streaming group by summary statistics over numpy chunks
+
+    Each chunk is grouped with numpy and reduced to one partial per group and
+    field, so memory depends on the number of groups (plus the distinct values
+    kept for 'distinct'), not the number of rows.  Partials can be merged, so
+    chunks can be summarized in separate processes, see ParallelSummaryStatistics().
+    Null values (nan, NaT and None) are left out of every statistic, and rows
+    with a null case value are one group with None in its key.
+
+    Required:
+    stats -- dictionary of {field: [statistic, ...]} or list of (field,
+        statistic) tuples, statistics are from STATISTICS
+
+    Optional:
+    group_by -- list of case fields.  Default is [] for one group
+    ddof -- delta degrees of freedom for std.  Default is 1 (sample)
+
+    # example usage:
+    gs = GroupStats({'ACRES': ['sum', 'mean'], 'OWNER': ['distinct']}, ['TOWNSHIP'])
+    for chunk in ChunkedSearchCursor(fc, ['TOWNSHIP', 'ACRES', 'OWNER']):
+        gs.update(chunk)
+    print gs.result()
+    """
+    def __init__(self, stats, group_by=[], ddof=1):
+        if isinstance(stats, dict):
+            stats = [(f, s) for f, fieldStats in sorted(stats.items()) for s in fieldStats]
+        self.stats = [(str(f), s.lower()) for f, s in stats]
+        for f, s in self.stats:
+            if s not in STATISTICS:
+                raise ValueError('"{}" is not a valid statistic!'.format(s))
+        self.group_by = [str(f) for f in group_by]
+        self.fields = sorted(set(f for f, s in self.stats))
+        self.distinct = set(f for f, s in self.stats if s == 'distinct')
+        self.ddof = ddof
+        self.groups = {}
+        self.dtypes = {}
+
+    @property
+    def fieldNames(self):
+        """every field needed in the chunks"""
+        return self.group_by + [f for f in self.fields if f not in self.group_by]
+
+    def _groups(self, chunk):
+        """returns (list of group keys, group number of each row)"""
+        import numpy
+        if not self.group_by:
+            return [()], numpy.zeros(len(chunk), numpy.intp)
+        cases = chunk[self.group_by]
+        nulls = [(i, null_mask(cases[f])) for i, f in enumerate(self.group_by)
+                 if cases.dtype[f].kind in 'fM']
+        nulls = [(i, mask) for i, mask in nulls if mask.any()]
+        if nulls:
+            # every nan is a group of its own to numpy.unique, so null case
+            # values are zeroed and flagged in an extra field instead
+            descr = [(f, cases.dtype[f]) for f in self.group_by]
+            descr += [('_null{}'.format(i), bool) for i, mask in nulls]
+            flagged = numpy.zeros(len(cases), descr)
+            for f in self.group_by:
+                flagged[f] = cases[f]
+            for i, mask in nulls:
+                flagged[self.group_by[i]][mask] = 0
+                flagged['_null{}'.format(i)] = mask
+            cases = flagged
+        keys, inverse = numpy.unique(cases, return_inverse=True)
+        n = len(self.group_by)
+        groups = []
+        for k in keys.tolist():
+            key = list(k[:n])
+            for j, (i, mask) in enumerate(nulls):
+                if k[n + j]:
+                    key[i] = None
+            groups.append(tuple(key))
+        return groups, inverse.ravel()
+
+    def update(self, chunk):
+        """adds a numpy structured array to the statistics"""
+        import numpy
+        if not len(chunk):
+            return
+        keys, inverse = self._groups(chunk)
+        for f in self.group_by:
+            self.dtypes.setdefault(f, chunk.dtype[f])
+        partials = []
+        for key in keys:
+            if key not in self.groups:
+                self.groups[key] = [0, dict((f, _Partial(f in self.distinct)) for f in self.fields)]
+            partials.append(self.groups[key])
+        for i, count in enumerate(numpy.bincount(inverse, minlength=len(keys))):
+            partials[i][0] += int(count)
+
+        for f in self.fields:
+            values = chunk[f]
+            self.dtypes.setdefault(f, values.dtype)
+            numeric = values.dtype.kind in 'iubf'
+            if not numeric and any(s in NUMERIC for field, s in self.stats if field == f):
+                raise ValueError('"{}" is not a numeric field!'.format(f))
+            valid = ~null_mask(values)
+            values, groups = values[valid], inverse[valid]
+            if not len(values):
+                continue
+
+            # sort once by group, then reduce each run of rows
+            order = numpy.argsort(groups, kind='mergesort')
+            values, groups = values[order], groups[order]
+            starts = numpy.concatenate([[0], numpy.flatnonzero(numpy.diff(groups)) + 1])
+            stops = numpy.append(starts[1:], len(values))
+            present = groups[starts]
+            counts = stops - starts
+            if values.dtype.kind in 'iubfM':
+                lows = numpy.minimum.reduceat(values, starts)
+                highs = numpy.maximum.reduceat(values, starts)
+            else:
+                # strings and objects have no minimum/maximum ufuncs
+                lows = [min(values[a:b]) for a, b in zip(starts, stops)]
+                highs = [max(values[a:b]) for a, b in zip(starts, stops)]
+            if numeric:
+                fvalues = values.astype('f8')
+                sums = numpy.add.reduceat(fvalues, starts)
+                means = sums / counts
+                m2s = numpy.add.reduceat((fvalues - numpy.repeat(means, counts)) ** 2, starts)
+            else:
+                sums = means = m2s = numpy.zeros(len(starts))
+            for j, g in enumerate(present):
+                distinct = None
+                if f in self.distinct:
+                    distinct = values[starts[j]:stops[j]].tolist()
+                partials[g][1][f].merge(int(counts[j]), float(sums[j]), float(means[j]),
+                                        float(m2s[j]), lows[j], highs[j], distinct)
+
+    def merge(self, other):
+        """adds the partials of another GroupStats with the same statistics"""
+        for key, (rows, partials) in other.groups.items():
+            if key not in self.groups:
+                self.groups[key] = [0, dict((f, _Partial(f in self.distinct)) for f in self.fields)]
+            mine = self.groups[key]
+            mine[0] += rows
+            for f, p in partials.items():
+                mine[1][f].merge(p.n, p.total, p.mean, p.m2, p.min, p.max, p.distinct)
+        for f, dt in other.dtypes.items():
+            self.dtypes.setdefault(f, dt)
+        return self
+
+    def _statDtype(self, f, s):
+        if s in ('count', 'distinct'):
+            return 'i8'
+        if s in ('min', 'max'):
+            return self.dtypes.get(f, 'f8')
+        return 'f8'
+
+    def _value(self, p, s):
+        import numpy
+        if s == 'count':
+            return p.n
+        if s == 'distinct':
+            return len(p.distinct)
+        if not p.n:
+            return None
+        if s == 'sum':
+            return p.total
+        if s == 'mean':
+            return p.mean
+        if s == 'std':
+            return numpy.sqrt(p.m2 / (p.n - self.ddof)) if p.n > self.ddof else numpy.nan
+        return p.min if s == 'min' else p.max
+
+    def result(self):
+        """returns a numpy structured array with one row per group, sorted by
+        the group fields, with the group fields, FREQUENCY (rows in the group)
+        and a <STATISTIC>_<field> field per statistic"""
+        import numpy
+        names = ['{}_{}'.format(s.upper(), f) for f, s in self.stats]
+        descr = [(f, self.dtypes.get(f, 'O')) for f in self.group_by] + [('FREQUENCY', 'i8')]
+        descr += [(n, self._statDtype(f, s)) for n, (f, s) in zip(names, self.stats)]
+        dtype = numpy.dtype(descr)
+        out = numpy.empty(len(self.groups), dtype)
+        for i, key in enumerate(sorted(self.groups, key=_caseOrder)):
+            rows, partials = self.groups[key]
+            values = list(key) + [rows]
+            for n, (f, s) in zip(names, self.stats):
+                v = self._value(partials[f], s)
+                if v is None:
+                    v = 0 if dtype[n].kind in 'iub' else null_for(dtype[n].kind)
+                values.append(v)
+            out[i] = tuple(values)
+        return out
+
+def SummaryStatistics(fc, stats, group_by=[], where=None, chunk_size=10000, null_value=None):
+    """Summarizes a table in one pass of ChunkedSearchCursor, see GroupStats
+
+    Required:
+    fc -- IFeatureClass pointer
+    stats -- see GroupStats
+
+    Optional:
+    group_by -- list of case fields
+    where -- where clause
+    chunk_size -- rows per chunk.  Default is 10000
+    null_value -- see ChunkedSearchCursor(), needed for nulls in integer fields
+
+    returns a numpy structured array, see GroupStats.result()
+    """
+    import arcobjects
+    gs = GroupStats(stats, group_by)
+    for chunk in arcobjects.ChunkedSearchCursor(fc, gs.fieldNames, chunk_size, null_value, where):
+        gs.update(chunk)
+    return gs.result()
+
+class _ChunkStats(object):
+    """picklable ParallelScan reducer that summarizes one chunk"""
+    def __init__(self, stats, group_by):
+        self.stats, self.group_by = stats, group_by
+
+    def __call__(self, chunk):
+        gs = GroupStats(self.stats, self.group_by)
+        gs.update(chunk)
+        return gs
+
+def ParallelSummaryStatistics(fc_path, stats, group_by=[], processes=None, chunk_size=10000,
+                              where=None, null_value=None):
+    """Summarizes a table with a pool of worker processes, see GroupStats
+
+    Each OID range is summarized in a worker and only the partials are sent
+    back and merged, see arcobjects.parallel.ParallelScan().
+
+    Required:
+    fc_path -- full path to feature class
+    stats -- see GroupStats
+
+    Optional:
+    group_by, where, chunk_size, null_value -- see SummaryStatistics()
+    processes -- number of worker processes.  Default is the number of cpus
+
+    returns a numpy structured array, see GroupStats.result()
+    """
+    from arcobjects.parallel import ParallelScan
+    total = GroupStats(stats, group_by)
+    reducer = _ChunkStats(stats, group_by)
+    for partial in ParallelScan(fc_path, total.fieldNames, reducer, processes, chunk_size,
+                                where, null_value):
+        total.merge(partial)
+    return total.result()
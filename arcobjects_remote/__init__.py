@@ -0,0 +1,9 @@
+"""Out of process access to the arcobjects helpers
+
+arcobjects only imports in 32 bit Python.  This package runs the helpers in a
+32 bit worker process (arcobjects_remote.worker) and streams record batches
+and coordinate arrays back to a client (arcobjects_remote.client) that can
+run in 64 bit Python.  Neither the client nor the framing imports arcobjects.
+"""
+from arcobjects_remote.framing import GeometryArrays, RemoteError, FramingError
+from arcobjects_remote.client import WorkerClient
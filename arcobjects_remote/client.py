@@ -0,0 +1,135 @@
+"""Client for the 32 bit arcobjects worker, usable from 64 bit Python"""
+import os
+import socket
+import subprocess
+import sys
+
+from arcobjects_remote import framing
+
+# folder containing the arcobjects_remote package, added to the worker's PYTHONPATH
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class WorkerClient(object):
+    r"""Proxy for an arcobjects worker process with the same cursor API
+
+    Feature classes are passed as full paths since COM pointers can not leave
+    the worker.
+
+    Optional:
+    python -- path to the 32 bit python.exe with ArcObjects access.  Default
+        is this interpreter.
+    address -- (host, port) of a worker started with --port instead of
+        starting one over pipes
+    stand_in -- start a worker that serves synthetic data.  Default is False
+    worker_args -- extra command line arguments for the worker
+
+    # example usage:
+    with WorkerClient(r'C:\Python27\ArcGIS10.2\python.exe') as client:
+        for chunk in client.ChunkedSearchCursor(r'C:\TEMP\parcels.gdb\parcels', ['ACRES']):
+            print(chunk['ACRES'].sum())
+    """
+    def __init__(self, python=None, address=None, stand_in=False, worker_args=()):
+        self.process = None
+        self._socket = None
+        self._streaming = False
+        if address:
+            self._socket = socket.create_connection(address)
+            self._in = self._socket.makefile('rb')
+            self._out = self._socket.makefile('wb')
+        else:
+            args = [python or sys.executable, '-m', 'arcobjects_remote.worker']
+            if stand_in:
+                args.append('--stand-in')
+            args.extend(worker_args)
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get('PYTHONPATH')]))
+            self.process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            env=env)
+            self._in = self.process.stdout
+            self._out = self.process.stdin
+
+    def _drain(self):
+        """skips the rest of a stream that was not read to the end"""
+        while self._streaming:
+            kind, payload = framing.read_frame(self._in)
+            if kind in (framing.END, framing.ERROR):
+                self._streaming = False
+
+    def _request(self, method, args, kwargs):
+        self._drain()
+        framing.write_frame(self._out, framing.CALL,
+                            framing.encode_json({'method': method, 'args': args, 'kwargs': kwargs}))
+
+    def _raise(self, payload):
+        error = framing.decode_json(payload)
+        raise framing.RemoteError(error['type'], error['message'], error.get('traceback'))
+
+    def _stream(self, method, args, kwargs):
+        self._request(method, args, kwargs)
+        self._streaming = True
+        while True:
+            kind, payload = framing.read_frame(self._in)
+            if kind == framing.END:
+                self._streaming = False
+                return
+            if kind == framing.ERROR:
+                self._streaming = False
+                self._raise(payload)
+            if kind == framing.ARRAY:
+                yield framing.decode_array(payload)
+            elif kind == framing.GEOMETRY:
+                yield framing.decode_geometry(payload)
+            else:
+                raise framing.FramingError('unexpected frame kind {0}'.format(kind))
+
+    def call(self, name, *args, **kwargs):
+        """runs an arcobjects helper in the worker and returns its result"""
+        self._request('call', [name] + list(args), kwargs)
+        kind, payload = framing.read_frame(self._in)
+        if kind == framing.ERROR:
+            self._raise(payload)
+        if kind != framing.RESULT:
+            raise framing.FramingError('unexpected frame kind {0}'.format(kind))
+        return framing.decode_json(payload)
+
+    def ChunkedSearchCursor(self, fc_path, fields, chunk_size=10000, null_value=None,
+                            where=None, spatial_filter=None, postfix=None):
+        """see arcobjects.ChunkedSearchCursor(), spatial_filter is an
+        (xmin, ymin, xmax, ymax) tuple"""
+        return self._stream('ChunkedSearchCursor', [fc_path, list(fields)],
+                            {'chunk_size': chunk_size, 'null_value': null_value, 'where': where,
+                             'spatial_filter': spatial_filter, 'postfix': postfix})
+
+    def ChunkedShapeCursor(self, fc_path, fields=[], chunk_size=10000, null_value=None,
+                           where=None, spatial_filter=None, postfix=None):
+        """see arcobjects.geometry.ChunkedShapeCursor(), yields (attribute array,
+        GeometryArrays)"""
+        return self._stream('ChunkedShapeCursor', [fc_path, list(fields)],
+                            {'chunk_size': chunk_size, 'null_value': null_value, 'where': where,
+                             'spatial_filter': spatial_filter, 'postfix': postfix})
+
+    def SearchCursor(self, fc_path, fields, where=None, spatial_filter=None, postfix=None):
+        """see arcobjects.SearchCursor(), yields a tuple for each row"""
+        for chunk in self.ChunkedSearchCursor(fc_path, fields, where=where,
+                                              spatial_filter=spatial_filter, postfix=postfix):
+            for row in chunk.tolist():
+                yield row
+
+    def close(self):
+        """stops the worker (or disconnects from it)"""
+        if self.process is not None:
+            self._out.close()
+            self.process.wait()
+            self._in.close()
+            self.process = None
+        elif self._socket is not None:
+            self._out.close()
+            self._in.close()
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
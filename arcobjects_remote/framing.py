@@ -0,0 +1,159 @@
+"""Binary framing used between the 32 bit ArcObjects worker and its clients
+
+Every message is a frame of a fixed header (magic, kind, payload length)
+followed by the payload.  Requests, scalar results and errors are JSON,
+record batches and coordinate arrays are sent as raw numpy buffers behind a
+small JSON description so no per-row encoding is done.
+
+This module does not import arcobjects (or comtypes) so it can be used from
+64 bit Python.
+"""
+import collections
+import json
+import struct
+
+MAGIC = b'AOR1'
+HEADER = struct.Struct('<4sBQ')
+META = struct.Struct('<I')
+
+# frame kinds
+CALL = 1
+RESULT = 2
+ERROR = 3
+ARRAY = 4
+GEOMETRY = 5
+END = 6
+
+# same fields as arcobjects.geometry.GeometryArrays
+GeometryArrays = collections.namedtuple('GeometryArrays',
+                                        'coords ring_offsets part_offsets geom_offsets geometry_type')
+GEOMETRY_ARRAYS = ('coords', 'ring_offsets', 'part_offsets', 'geom_offsets')
+
+class FramingError(IOError):
+    """raised for a malformed or truncated frame"""
+    pass
+
+class RemoteError(Exception):
+    """raised in the client for an exception in the worker"""
+    def __init__(self, error_type, message, traceback=None):
+        Exception.__init__(self, '{0}: {1}'.format(error_type, message))
+        self.error_type = error_type
+        self.message = message
+        self.traceback = traceback
+
+def _readExactly(stream, size):
+    """reads size bytes into a bytearray, raises EOFError if the stream is closed first"""
+    buf = bytearray()
+    while len(buf) < size:
+        data = stream.read(size - len(buf))
+        if not data:
+            if not buf:
+                raise EOFError('stream closed')
+            raise FramingError('stream closed after {0} of {1} bytes'.format(len(buf), size))
+        buf.extend(data)
+    return buf
+
+def write_frame(stream, kind, payload=b''):
+    """writes one frame to a binary stream"""
+    stream.write(HEADER.pack(MAGIC, kind, len(payload)))
+    if payload:
+        stream.write(payload)
+    stream.flush()
+
+def read_frame(stream):
+    """reads one frame from a binary stream, returns (kind, bytearray payload)"""
+    magic, kind, size = HEADER.unpack(bytes(_readExactly(stream, HEADER.size)))
+    if magic != MAGIC:
+        raise FramingError('bad frame header {0!r}'.format(magic))
+    if not size:
+        return kind, bytearray()
+    try:
+        return kind, _readExactly(stream, size)
+    except EOFError:
+        raise FramingError('stream closed before the payload')
+
+def encode_json(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def decode_json(payload):
+    return json.loads(bytes(payload).decode('utf-8'))
+
+def _packed(arr):
+    """returns arr as a contiguous array without structured field padding"""
+    import numpy
+    if arr.dtype.names:
+        if arr.dtype.hasobject:
+            raise TypeError('object fields (such as shapes) can not be sent, '
+                            'use ChunkedShapeCursor for geometry')
+        packed = numpy.dtype([(n, arr.dtype[n]) for n in arr.dtype.names])
+        if packed != arr.dtype:
+            arr = arr.astype(packed)
+    elif arr.dtype.hasobject:
+        raise TypeError('object arrays can not be sent')
+    return numpy.ascontiguousarray(arr)
+
+def _arrayMeta(arr):
+    if arr.dtype.names:
+        descr = [[str(n), arr.dtype[n].str] for n in arr.dtype.names]
+    else:
+        descr = arr.dtype.str
+    return {'descr': descr, 'shape': list(arr.shape), 'nbytes': arr.nbytes}
+
+def _metaDtype(meta):
+    import numpy
+    descr = meta['descr']
+    if isinstance(descr, list):
+        return numpy.dtype([(str(n), str(t)) for n, t in descr])
+    return numpy.dtype(str(descr))
+
+def array_bytes(arr):
+    """returns the raw buffer of a numpy array as bytes"""
+    # tobytes() is not available in older numpy releases
+    return arr.tobytes() if hasattr(arr, 'tobytes') else arr.tostring()
+
+def _encodeArrays(arrays, extra):
+    arrays = [_packed(a) for a in arrays]
+    meta = dict(extra, arrays=[_arrayMeta(a) for a in arrays])
+    header = encode_json(meta)
+    return b''.join([META.pack(len(header)), header] + [array_bytes(a) for a in arrays])
+
+def _decodeArrays(payload):
+    import numpy
+    view = memoryview(payload)
+    size = META.unpack(view[:META.size].tobytes())[0]
+    meta = decode_json(view[META.size:META.size + size].tobytes())
+    pos = META.size + size
+    arrays = []
+    for info in meta['arrays']:
+        dtype = _metaDtype(info)
+        count = int(numpy.prod(info['shape'])) if info['shape'] else 1
+        if count:
+            # frombuffer on the bytearray gives a writable array without a copy
+            arr = numpy.frombuffer(payload, dtype, count, pos)
+        else:
+            arr = numpy.empty(0, dtype)
+        arrays.append(arr.reshape(info['shape']))
+        pos += info['nbytes']
+    return meta, arrays
+
+def encode_array(arr):
+    """encodes a numpy (structured) array for an ARRAY frame"""
+    return _encodeArrays([arr], {})
+
+def decode_array(payload):
+    """decodes an ARRAY frame payload to a numpy array"""
+    return _decodeArrays(payload)[1][0]
+
+def encode_geometry(attributes, geometry):
+    """encodes an attribute array (or None) and GeometryArrays for a GEOMETRY frame"""
+    arrays = [getattr(geometry, name) for name in GEOMETRY_ARRAYS]
+    if attributes is not None:
+        arrays.append(attributes)
+    return _encodeArrays(arrays, {'geometry_type': geometry.geometry_type})
+
+def decode_geometry(payload):
+    """decodes a GEOMETRY frame payload to (attribute array or None, GeometryArrays)"""
+    meta, arrays = _decodeArrays(payload)
+    geometry = GeometryArrays(*(arrays[:4] + [meta['geometry_type']]))
+    attributes = arrays[4] if len(arrays) > 4 else None
+    return attributes, geometry
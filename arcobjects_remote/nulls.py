@@ -0,0 +1,52 @@
+"""Null substitutes and null masks for numpy arrays of table rows
+
+Nulls come out of arcobjects.ChunkedSearchCursor as nan (float), NaT (date),
+u'' (text) or None (object) unless a null_value is given.  The cursors, the
+join and the summary engines all use these helpers so they agree on what a
+null is.
+
+This module does not import arcobjects (or comtypes) so it can be used from
+64 bit Python.
+"""
+
+def null_for(kind):
+    """returns the null substitute for a numpy dtype kind, None for kinds
+    that have none (integers and booleans)"""
+    import numpy
+    if kind == 'f':
+        return numpy.nan
+    if kind == 'M':
+        return numpy.datetime64('NaT')
+    return {'U': u'', 'S': b'', 'O': None}.get(kind)
+
+def null_substitutes(dtype, null_value=None):
+    """returns the null substitute for each field of a structured dtype
+
+    Optional:
+    null_value -- a single value for every field, or a dictionary of field
+        name to value (fields not in it get the default).  Default is None
+        which uses null_for() for every field
+    """
+    nulls = []
+    for name in dtype.names:
+        if isinstance(null_value, dict):
+            nulls.append(null_value.get(name, null_for(dtype[name].kind)))
+        elif null_value is not None:
+            nulls.append(null_value)
+        else:
+            nulls.append(null_for(dtype[name].kind))
+    return nulls
+
+def null_mask(values):
+    """returns a boolean array that is True for the nulls (nan, NaT and None)
+    of a numpy array, text substitutes (u'') are not nulls here"""
+    import numpy
+    kind = values.dtype.kind
+    if kind == 'f':
+        return numpy.isnan(values)
+    if kind == 'M':
+        # isnat() is not available in older numpy releases
+        return numpy.isnat(values) if hasattr(numpy, 'isnat') else values != values
+    if kind == 'O':
+        return numpy.array([v is None for v in values], bool)
+    return numpy.zeros(len(values), bool)
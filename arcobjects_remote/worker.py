@@ -0,0 +1,183 @@
+"""32 bit worker host for the arcobjects helpers
+
+Run with the 32 bit Python that has ArcObjects access:
+
+    python -m arcobjects_remote.worker              (frames over stdin/stdout)
+    python -m arcobjects_remote.worker --port 8765  (frames over a socket)
+
+--stand-in serves synthetic data without importing arcobjects, which is enough
+to exercise the transport and framing on machines without ArcGIS.
+"""
+import os
+import socket
+import sys
+import traceback
+
+from arcobjects_remote import framing
+
+class ArcObjectsHandler(object):
+    """Runs requests against the arcobjects helpers in this process
+
+    The license is checked out once when the handler is created and feature
+    classes are opened through the arcobjects workspace pool.
+    """
+    # generator methods, their results are sent as a stream of frames
+    STREAMS = ('ChunkedSearchCursor', 'ChunkedShapeCursor')
+
+    # arcobjects functions that can be run through call(), their results must
+    # be JSON serializable
+    FUNCTIONS = ('GetVersion', 'InstallInfo', 'CheckGDBRelease', 'GetModifiedDate',
+                 'GetDatasetStats', 'mxd_version', 'create_mxd', 'alter_alias', 'alter_fieldName')
+
+    def __init__(self):
+        import arcobjects
+        self.arcobjects = arcobjects
+        arcobjects.InitStandalone()
+
+    def _open(self, fc_path):
+        fc = self.arcobjects.OpenFeatureClass(*os.path.split(fc_path))
+        if fc is None:
+            raise ValueError('"{}" does not exist!'.format(fc_path))
+        return fc
+
+    def ChunkedSearchCursor(self, fc_path, fields, chunk_size=10000, null_value=None,
+                            where=None, spatial_filter=None, postfix=None):
+        fc = self._open(fc_path)
+        for chunk in self.arcobjects.ChunkedSearchCursor(fc, fields, chunk_size, null_value, where,
+                                                         spatial_filter, postfix):
+            yield framing.ARRAY, framing.encode_array(chunk)
+
+    def ChunkedShapeCursor(self, fc_path, fields=[], chunk_size=10000, null_value=None,
+                           where=None, spatial_filter=None, postfix=None):
+        from arcobjects import geometry
+        fc = self._open(fc_path)
+        for attrs, geom in geometry.ChunkedShapeCursor(fc, fields, chunk_size, null_value, where,
+                                                       spatial_filter, postfix):
+            yield framing.GEOMETRY, framing.encode_geometry(attrs, geom)
+
+    def call(self, name, *args, **kwargs):
+        if name not in self.FUNCTIONS:
+            raise ValueError('"{}" can not be called remotely!'.format(name))
+        return getattr(self.arcobjects, name)(*args, **kwargs)
+
+class StandInHandler(object):
+    """Serves synthetic data with the same methods as ArcObjectsHandler
+
+    Every feature class has rows features, OBJECTID fields are int32 and all
+    other fields are float64 (OID * 0.5).  Shapes are two vertex polylines.
+    """
+    STREAMS = ArcObjectsHandler.STREAMS
+
+    def __init__(self, rows=1000):
+        self.rows = rows
+
+    def _chunks(self, fields, chunk_size):
+        import numpy
+        dtype = numpy.dtype([(str(f), 'i4' if f.upper() == 'OBJECTID' else 'f8') for f in fields])
+        for start in range(1, self.rows + 1, chunk_size):
+            oids = numpy.arange(start, min(start + chunk_size, self.rows + 1))
+            chunk = numpy.empty(len(oids), dtype)
+            for name in dtype.names:
+                chunk[name] = oids if dtype[name].kind == 'i' else oids * 0.5
+            yield chunk
+
+    def ChunkedSearchCursor(self, fc_path, fields, chunk_size=10000, null_value=None,
+                            where=None, spatial_filter=None, postfix=None):
+        for chunk in self._chunks(fields, chunk_size):
+            yield framing.ARRAY, framing.encode_array(chunk)
+
+    def ChunkedShapeCursor(self, fc_path, fields=[], chunk_size=10000, null_value=None,
+                           where=None, spatial_filter=None, postfix=None):
+        import numpy
+        for chunk in self._chunks(list(fields) or ['OBJECTID'], chunk_size):
+            n = len(chunk)
+            coords = numpy.zeros((n * 2, 2), numpy.float64)
+            coords[::2, 0] = numpy.arange(n)
+            coords[1::2, 0] = numpy.arange(n) + 1.0
+            offsets = numpy.arange(n + 1, dtype=numpy.int32)
+            geom = framing.GeometryArrays(coords, offsets * 2, offsets, offsets, 3)
+            yield framing.GEOMETRY, framing.encode_geometry(chunk if fields else None, geom)
+
+    def call(self, name, *args, **kwargs):
+        if name == 'GetVersion':
+            return 'stand-in'
+        if name == 'echo':
+            return [args, kwargs]
+        raise ValueError('"{}" can not be called remotely!'.format(name))
+
+def _error(exc):
+    return framing.encode_json({'type': exc.__class__.__name__, 'message': str(exc),
+                                'traceback': traceback.format_exc()})
+
+def serve(handler, instream, outstream):
+    """answers CALL frames from instream until it is closed"""
+    while True:
+        try:
+            kind, payload = framing.read_frame(instream)
+        except EOFError:
+            return
+        if kind != framing.CALL:
+            framing.write_frame(outstream, framing.ERROR,
+                                _error(framing.FramingError('expected a CALL frame')))
+            continue
+        try:
+            request = framing.decode_json(payload)
+            name = request['method']
+            if name != 'call' and name not in handler.STREAMS:
+                raise ValueError('unknown method "{}"'.format(name))
+            args = request.get('args', [])
+            kwargs = dict((str(k), v) for k, v in request.get('kwargs', {}).items())
+            result = getattr(handler, name)(*args, **kwargs)
+            if name in handler.STREAMS:
+                for frameKind, frame in result:
+                    framing.write_frame(outstream, frameKind, frame)
+                framing.write_frame(outstream, framing.END)
+            else:
+                framing.write_frame(outstream, framing.RESULT, framing.encode_json(result))
+        except Exception as e:
+            framing.write_frame(outstream, framing.ERROR, _error(e))
+
+def _binary(stream, mode):
+    """returns a binary file for a standard stream"""
+    fd = stream.fileno()
+    if sys.platform == 'win32':
+        import msvcrt
+        msvcrt.setmode(fd, os.O_BINARY)
+    return os.fdopen(os.dup(fd), mode)
+
+def serve_stdio(handler):
+    """serves frames over stdin/stdout, anything printed goes to stderr"""
+    instream = _binary(sys.stdin, 'rb')
+    outstream = _binary(sys.stdout, 'wb')
+    sys.stdout = sys.stderr
+    serve(handler, instream, outstream)
+
+def serve_socket(handler, port, host='127.0.0.1'):
+    """serves one client connection at a time on host:port"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(1)
+    while True:
+        conn, address = listener.accept()
+        try:
+            serve(handler, conn.makefile('rb'), conn.makefile('wb'))
+        finally:
+            conn.close()
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, help='serve on a socket instead of stdin/stdout')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--stand-in', action='store_true', help='serve synthetic data')
+    parser.add_argument('--rows', type=int, default=1000, help='stand-in feature count')
+    opts = parser.parse_args(argv)
+    handler = StandInHandler(opts.rows) if opts.stand_in else ArcObjectsHandler()
+    if opts.port:
+        serve_socket(handler, opts.port, opts.host)
+    else:
+        serve_stdio(handler)
+
+if __name__ == '__main__':
+    main()
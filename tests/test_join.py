@@ -0,0 +1,110 @@
+"""Tests for the numpy join engine (KeyIndex and HashJoin)
+
+The engine is pure numpy.  join.py is loaded from its file because the
+arcobjects package itself only imports in 32 bit Python with ArcObjects.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load(name):
+    """imports arcobjects/<name>.py without the arcobjects package"""
+    path = os.path.join(ROOT, 'arcobjects', name + '.py')
+    if sys.version_info[0] < 3:
+        import imp
+        return imp.load_source('arcobjects_' + name, path)
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('arcobjects_' + name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+join = load('join')
+
+PARCELS = numpy.array([(1, 10, 1.5), (2, 20, 2.5), (3, 30, 3.5), (4, 20, 4.5), (5, 99, 5.5)],
+                      dtype=[('OBJECTID', 'i4'), ('PIN', 'i4'), ('ACRES', 'f8')])
+OWNERS = numpy.array([(10, u'Ann', 7), (20, u'Bob', 8), (20, u'Cy', 9), (30, u'Dee', 10)],
+                     dtype=[('PIN', 'i4'), ('OWNER', 'U10'), ('OBJECTID', 'i4')])
+
+def chunks(arr, size):
+    return [arr[i:i + size] for i in range(0, len(arr), size)]
+
+def rows(out, fields):
+    return sorted(tuple(r) for r in numpy.concatenate(out)[fields].tolist())
+
+class KeyIndexTest(unittest.TestCase):
+
+    def test_lookup(self):
+        index = join.KeyIndex(numpy.array([3.0, 1.0, 2.0, 1.0, numpy.nan]))
+        self.assertEqual(len(index), 4)
+        probeRows, buildRows, counts = index.lookup(numpy.array([1.0, 2.0, 5.0, numpy.nan]))
+        self.assertEqual(counts.tolist(), [2, 1, 0, 0])
+        self.assertEqual(list(zip(probeRows.tolist(), buildRows.tolist())), [(0, 1), (0, 3), (1, 2)])
+
+    def test_object_keys(self):
+        index = join.KeyIndex(numpy.array([u'a', None, u'b'], object)[[0, 2]])
+        probeRows, buildRows, counts = index.lookup(numpy.array([u'b', None], object))
+        self.assertEqual(counts.tolist(), [1, 0])
+        self.assertEqual(buildRows.tolist(), [1])
+
+class HashJoinTest(unittest.TestCase):
+
+    def test_inner_one_to_many(self):
+        out = list(join.HashJoin(chunks(PARCELS, 2), OWNERS, 'PIN'))
+        self.assertEqual(out[0].dtype.names, ('OBJECTID', 'PIN', 'ACRES', 'OWNER', 'OBJECTID_1'))
+        self.assertEqual(rows(out, ['OBJECTID', 'OWNER']),
+                         [(1, u'Ann'), (2, u'Bob'), (2, u'Cy'), (3, u'Dee'), (4, u'Bob'), (4, u'Cy')])
+
+    def test_left(self):
+        out = numpy.concatenate(list(join.HashJoin(chunks(PARCELS, 2), OWNERS, 'PIN', how='left',
+                                                   fields=['OWNER', 'OBJECTID'])))
+        # probe order is kept
+        self.assertEqual(out['OBJECTID'].tolist(), [1, 2, 2, 3, 4, 4, 5])
+        self.assertEqual(out['OWNER'][-1], u'')
+        # integer build fields become float so unmatched rows can be nan
+        self.assertEqual(out['OBJECTID_1'].dtype.kind, 'f')
+        self.assertTrue(numpy.isnan(out['OBJECTID_1'][-1]))
+
+    def test_left_null_value(self):
+        out = numpy.concatenate(list(join.HashJoin([PARCELS], OWNERS, 'PIN', how='left',
+                                                   fields=['OBJECTID'], null_value=-1)))
+        self.assertEqual(out['OBJECTID_1'].dtype.kind, 'i')
+        self.assertEqual(out['OBJECTID_1'][-1], -1)
+
+    def test_null_keys(self):
+        probe = numpy.array([(1, numpy.nan), (2, 1.0)], dtype=[('OBJECTID', 'i4'), ('KEY', 'f8')])
+        build = numpy.array([(numpy.nan, u'x'), (1.0, u'y')], dtype=[('KEY', 'f8'), ('NAME', 'U5')])
+        out = numpy.concatenate(list(join.HashJoin([probe], build, 'KEY', how='left')))
+        self.assertEqual(out['NAME'].tolist(), [u'', u'y'])
+        self.assertEqual(len(list(join.HashJoin([probe[:1]], build, 'KEY'))), 0)
+
+    def test_build_key(self):
+        owners = numpy.array(OWNERS.tolist(), [('PARCEL_PIN', 'i4'), ('OWNER', 'U10'), ('OID', 'i4')])
+        out = list(join.HashJoin([PARCELS], owners, 'PIN', build_key='PARCEL_PIN', fields=['OWNER']))
+        self.assertEqual(len(numpy.concatenate(out)), 6)
+
+    def test_spill(self):
+        folder = tempfile.mkdtemp()
+        try:
+            expected = list(join.HashJoin(chunks(PARCELS, 2), OWNERS, 'PIN', how='left'))
+            out = list(join.HashJoin(chunks(PARCELS, 2), chunks(OWNERS, 1), 'PIN', how='left',
+                                     max_build_bytes=1, partitions=3, spill_dir=folder))
+            self.assertEqual(rows(out, ['OBJECTID', 'OWNER']), rows(expected, ['OBJECTID', 'OWNER']))
+            self.assertEqual(numpy.isnan(numpy.concatenate(out)['OBJECTID_1']).sum(), 1)
+            # the spill files are removed when the join is done
+            self.assertEqual(os.listdir(folder), [])
+        finally:
+            shutil.rmtree(folder)
+
+    def test_bad_how(self):
+        self.assertRaises(ValueError, list, join.HashJoin([PARCELS], OWNERS, 'PIN', how='outer'))
+
+if __name__ == '__main__':
+    unittest.main()
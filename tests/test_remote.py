@@ -0,0 +1,153 @@
+"""Tests for the arcobjects_remote framing and the stand-in worker
+
+These run without ArcGIS: the framing is pure numpy and the client talks to a
+worker started with --stand-in.
+"""
+import io
+import os
+import sys
+import unittest
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arcobjects_remote import framing
+from arcobjects_remote import FramingError, RemoteError, WorkerClient
+
+class FramingTest(unittest.TestCase):
+
+    def roundTrip(self, kind, payload):
+        stream = io.BytesIO()
+        framing.write_frame(stream, kind, payload)
+        stream.seek(0)
+        return framing.read_frame(stream)
+
+    def test_structured_array(self):
+        arr = numpy.array([(1, 2.5, u'abc', numpy.datetime64('2015-03-01')),
+                           (2, numpy.nan, u'', numpy.datetime64('NaT'))],
+                          dtype=[('OBJECTID', 'i4'), ('ACRES', 'f8'), ('NAME', 'U5'),
+                                 ('DATE', 'M8[D]')])
+        kind, payload = self.roundTrip(framing.ARRAY, framing.encode_array(arr))
+        self.assertEqual(kind, framing.ARRAY)
+        out = framing.decode_array(payload)
+        self.assertEqual(out.dtype, arr.dtype)
+        self.assertEqual(out['OBJECTID'].tolist(), [1, 2])
+        self.assertEqual(out['NAME'].tolist(), [u'abc', u''])
+        self.assertEqual(out['DATE'][0], arr['DATE'][0])
+        self.assertTrue(numpy.isnat(out['DATE'][1]))
+        self.assertTrue(numpy.isnan(out['ACRES'][1]))
+
+    def test_padded_array(self):
+        arr = numpy.zeros(3, numpy.dtype([('A', 'i1'), ('B', 'f8')], align=True))
+        arr['B'] = [1, 2, 3]
+        out = framing.decode_array(framing.encode_array(arr))
+        self.assertEqual(out.dtype.names, ('A', 'B'))
+        self.assertEqual(out['B'].tolist(), [1.0, 2.0, 3.0])
+
+    def test_empty_array(self):
+        arr = numpy.empty(0, [('OBJECTID', 'i4'), ('NAME', 'U10')])
+        kind, payload = self.roundTrip(framing.ARRAY, framing.encode_array(arr))
+        out = framing.decode_array(payload)
+        self.assertEqual(len(out), 0)
+        self.assertEqual(out.dtype, arr.dtype)
+
+    def test_object_array_refused(self):
+        arr = numpy.array([(1, None)], dtype=[('OBJECTID', 'i4'), ('Shape', 'O')])
+        self.assertRaises(TypeError, framing.encode_array, arr)
+
+    def test_geometry(self):
+        coords = numpy.arange(8, dtype=numpy.float64).reshape(4, 2)
+        offsets = numpy.array([0, 2, 4], numpy.int32)
+        parts = numpy.array([0, 1, 2], numpy.int32)
+        geom = framing.GeometryArrays(coords, offsets, parts, parts, 3)
+        attrs = numpy.array([(1,), (2,)], dtype=[('OBJECTID', 'i4')])
+        outAttrs, outGeom = framing.decode_geometry(framing.encode_geometry(attrs, geom))
+        self.assertEqual(outAttrs['OBJECTID'].tolist(), [1, 2])
+        self.assertEqual(outGeom.geometry_type, 3)
+        self.assertTrue((outGeom.coords == coords).all())
+        self.assertEqual(outGeom.ring_offsets.tolist(), [0, 2, 4])
+        self.assertEqual(framing.decode_geometry(framing.encode_geometry(None, geom))[0], None)
+
+    def test_json(self):
+        kind, payload = self.roundTrip(framing.RESULT, framing.encode_json({'a': [1, 2]}))
+        self.assertEqual(kind, framing.RESULT)
+        self.assertEqual(framing.decode_json(payload), {'a': [1, 2]})
+
+    def test_truncated_payload(self):
+        stream = io.BytesIO()
+        framing.write_frame(stream, framing.ARRAY, framing.encode_array(numpy.arange(10)))
+        data = stream.getvalue()
+        self.assertRaises(FramingError, framing.read_frame, io.BytesIO(data[:-5]))
+        # cut right after the header
+        self.assertRaises(FramingError, framing.read_frame,
+                          io.BytesIO(data[:framing.HEADER.size]))
+
+    def test_truncated_header(self):
+        stream = io.BytesIO()
+        framing.write_frame(stream, framing.END)
+        self.assertRaises(FramingError, framing.read_frame, io.BytesIO(stream.getvalue()[:5]))
+
+    def test_closed_stream(self):
+        self.assertRaises(EOFError, framing.read_frame, io.BytesIO(b''))
+
+    def test_bad_magic(self):
+        stream = io.BytesIO(framing.HEADER.pack(b'XXXX', framing.END, 0))
+        self.assertRaises(FramingError, framing.read_frame, stream)
+
+class StandInClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = WorkerClient(stand_in=True, worker_args=['--rows', '25'])
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_call(self):
+        self.assertEqual(self.client.call('GetVersion'), 'stand-in')
+        self.assertEqual(self.client.call('echo', 1, 'a', key=[2, 3]), [[1, 'a'], {'key': [2, 3]}])
+
+    def test_remote_error(self):
+        try:
+            self.client.call('DeleteEverything')
+        except RemoteError as e:
+            self.assertEqual(e.error_type, 'ValueError')
+            self.assertTrue(e.traceback)
+        else:
+            self.fail('RemoteError not raised')
+        # the worker keeps serving after an error
+        self.assertEqual(self.client.call('GetVersion'), 'stand-in')
+
+    def test_stream(self):
+        chunks = list(self.client.ChunkedSearchCursor('fc', ['OBJECTID', 'ACRES'], chunk_size=10))
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        oids = numpy.concatenate([c['OBJECTID'] for c in chunks])
+        self.assertEqual(oids.tolist(), list(range(1, 26)))
+        self.assertEqual(chunks[0]['ACRES'][1], 1.0)
+
+    def test_search_cursor(self):
+        rows = list(self.client.SearchCursor('fc', ['OBJECTID']))
+        self.assertEqual(rows[:2], [(1,), (2,)])
+        self.assertEqual(len(rows), 25)
+
+    def test_shape_stream(self):
+        chunks = list(self.client.ChunkedShapeCursor('fc', ['OBJECTID'], chunk_size=20))
+        self.assertEqual(len(chunks), 2)
+        attrs, geom = chunks[0]
+        self.assertEqual(len(attrs), 20)
+        self.assertEqual(geom.geometry_type, 3)
+        self.assertEqual(len(geom.coords), 40)
+        self.assertEqual(len(geom.geom_offsets), 21)
+
+    def test_abandoned_stream(self):
+        stream = self.client.ChunkedSearchCursor('fc', ['OBJECTID'], chunk_size=5)
+        first = next(stream)
+        self.assertEqual(first['OBJECTID'].tolist(), [1, 2, 3, 4, 5])
+        # the rest of the stream is skipped before the next request
+        self.assertEqual(self.client.call('GetVersion'), 'stand-in')
+        chunks = list(self.client.ChunkedSearchCursor('fc', ['OBJECTID'], chunk_size=25))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(len(chunks[0]), 25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the streaming group by statistics (GroupStats)
+
+The engine is pure numpy.  summary.py is loaded from its file because the
+arcobjects package itself only imports in 32 bit Python with ArcObjects.
+"""
+import os
+import sys
+import unittest
+
+import numpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load(name):
+    """imports arcobjects/<name>.py without the arcobjects package"""
+    path = os.path.join(ROOT, 'arcobjects', name + '.py')
+    if sys.version_info[0] < 3:
+        import imp
+        return imp.load_source('arcobjects_' + name, path)
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('arcobjects_' + name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+summary = load('summary')
+
+DTYPE = [('ZONE', 'U5'), ('TOWNSHIP', 'f8'), ('ACRES', 'f8'), ('OWNER', 'O')]
+
+def table(rows):
+    return numpy.array(rows, DTYPE)
+
+class GroupStatsTest(unittest.TestCase):
+
+    def test_groups(self):
+        gs = summary.GroupStats({'ACRES': ['sum', 'count', 'min', 'max', 'mean'],
+                                 'OWNER': ['distinct']}, ['ZONE'])
+        gs.update(table([(u'AG', 1, 2.0, u'a'), (u'RES', 1, 1.0, u'b'), (u'AG', 2, 4.0, u'a'),
+                         (u'AG', 2, numpy.nan, None)]))
+        out = gs.result()
+        self.assertEqual(out.dtype.names, ('ZONE', 'FREQUENCY', 'SUM_ACRES', 'COUNT_ACRES',
+                                           'MIN_ACRES', 'MAX_ACRES', 'MEAN_ACRES', 'DISTINCT_OWNER'))
+        self.assertEqual(out.dtype['ZONE'], numpy.dtype('U5'))
+        self.assertEqual(out['ZONE'].tolist(), [u'AG', u'RES'])
+        self.assertEqual(out['FREQUENCY'].tolist(), [3, 1])
+        # nulls are left out of the statistics
+        self.assertEqual(out['COUNT_ACRES'].tolist(), [2, 1])
+        self.assertEqual(out['SUM_ACRES'].tolist(), [6.0, 1.0])
+        self.assertEqual(out['MEAN_ACRES'].tolist(), [3.0, 1.0])
+        self.assertEqual(out['MIN_ACRES'].tolist(), [2.0, 1.0])
+        self.assertEqual(out['DISTINCT_OWNER'].tolist(), [1, 1])
+
+    def test_null_case_values(self):
+        gs = summary.GroupStats({'ACRES': ['sum']}, ['ZONE', 'TOWNSHIP'])
+        chunk = table([(u'AG', numpy.nan, 1.0, None), (u'AG', 1, 2.0, None),
+                       (u'AG', numpy.nan, 4.0, None), (u'RES', numpy.nan, 8.0, None)])
+        gs.update(chunk[:2])
+        gs.update(chunk[2:])
+        self.assertEqual(len(gs.groups), 3)
+        out = gs.result()
+        self.assertEqual(out['ZONE'].tolist(), [u'AG', u'AG', u'RES'])
+        self.assertTrue(numpy.isnan(out['TOWNSHIP'][0]))
+        self.assertEqual(out['TOWNSHIP'][1], 1.0)
+        self.assertEqual(out['SUM_ACRES'].tolist(), [5.0, 2.0, 8.0])
+
+    def test_null_dates(self):
+        gs = summary.GroupStats({'N': ['count']}, ['DATE'])
+        dates = numpy.array(['2015-01-01', 'NaT', '2015-01-01', 'NaT'], 'M8[D]')
+        gs.update(numpy.array(list(zip(dates, range(4))), [('DATE', 'M8[D]'), ('N', 'i4')]))
+        out = gs.result()
+        self.assertEqual(out['FREQUENCY'].tolist(), [2, 2])
+        self.assertTrue(numpy.isnat(out['DATE'][0]))
+
+    def test_std_merge(self):
+        values = numpy.random.RandomState(1).normal(1e6, 3.0, 1000)
+        chunk = numpy.array([(u'A', 0, v, None) for v in values], DTYPE)
+        merged = summary.GroupStats({'ACRES': ['std', 'mean']}, ['ZONE'])
+        for start in range(0, len(chunk), 70):
+            part = summary.GroupStats({'ACRES': ['std', 'mean']}, ['ZONE'])
+            part.update(chunk[start:start + 70])
+            merged.merge(part)
+        out = merged.result()
+        self.assertAlmostEqual(out['STD_ACRES'][0], numpy.std(values, ddof=1), places=6)
+        self.assertAlmostEqual(out['MEAN_ACRES'][0], values.mean(), places=6)
+
+    def test_merge_chunks(self):
+        rows = [(u'AG', 1, 2.0, u'a'), (u'RES', 1, 1.0, u'b'), (u'AG', numpy.nan, 4.0, u'c'),
+                (u'RES', numpy.nan, 3.0, u'b'), (u'AG', numpy.nan, 5.0, u'a')]
+        stats = {'ACRES': ['sum', 'max'], 'OWNER': ['distinct']}
+        whole = summary.GroupStats(stats, ['TOWNSHIP'])
+        whole.update(table(rows))
+        merged = summary.GroupStats(stats, ['TOWNSHIP'])
+        for i in range(len(rows)):
+            part = summary.GroupStats(stats, ['TOWNSHIP'])
+            part.update(table(rows[i:i + 1]))
+            merged.merge(part)
+        expected, out = whole.result(), merged.result()
+        self.assertEqual(len(out), 2)
+        self.assertEqual(out['FREQUENCY'].tolist(), expected['FREQUENCY'].tolist())
+        self.assertEqual(out['SUM_ACRES'].tolist(), [12.0, 3.0])
+        self.assertEqual(out['MAX_ACRES'].tolist(), expected['MAX_ACRES'].tolist())
+        self.assertEqual(out['DISTINCT_OWNER'].tolist(), [3, 2])
+
+    def test_bad_statistic(self):
+        self.assertRaises(ValueError, summary.GroupStats, {'ACRES': ['median']})
+        gs = summary.GroupStats({'ZONE': ['sum']})
+        self.assertRaises(ValueError, gs.update, table([(u'AG', 1, 2.0, None)]))
+
+if __name__ == '__main__':
+    unittest.main()